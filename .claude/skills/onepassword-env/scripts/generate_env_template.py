@@ -25,6 +25,8 @@ Example:
 """
 
 import argparse
+import io
+import os
 import re
 import sys
 from pathlib import Path
@@ -41,6 +43,12 @@ SECRET_KEYWORDS = [
     'AUTH',
 ]
 
+# All keywords in one case-insensitive scan (no key.upper() copy per variable)
+_SECRET_RE = re.compile('|'.join(SECRET_KEYWORDS), re.IGNORECASE).search
+
+# KEY=value line (match() anchors at the start; input is a single stripped line)
+_VAR_RE = re.compile(r'([A-Za-z_][A-Za-z0-9_]*)=(.*)').match
+
 
 def is_secret_key(key):
     """
@@ -52,8 +60,7 @@ def is_secret_key(key):
     Returns:
         True if key likely contains a secret
     """
-    key_upper = key.upper()
-    return any(keyword in key_upper for keyword in SECRET_KEYWORDS)
+    return _SECRET_RE(key) is not None
 
 
 def normalize_field_name(key):
@@ -91,7 +98,7 @@ def parse_env_line(line):
         return ('comment', None, None, line)
 
     # Variable line (KEY=value or KEY="value")
-    match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$', stripped)
+    match = _VAR_RE(stripped)
     if match:
         key = match.group(1)
         value = match.group(2)
@@ -116,6 +123,29 @@ def generate_op_reference(vault, item, field):
     return f'op://{vault}/{item}/{field}'
 
 
+def convert_env_stream(infile, outfile, vault_name, item_name):
+    """
+    Convert .env lines to .env.tpl template, writing each line as it is read.
+
+    Args:
+        infile: Iterable of .env lines (e.g. file object opened for reading)
+        outfile: File object the template is written to
+        vault_name: 1Password vault name
+        item_name: 1Password item name
+    """
+    for line in infile:
+        line_type, key, value, original = parse_env_line(line)
+
+        if line_type == 'variable' and is_secret_key(key):
+            # Replace secret value with op:// reference
+            field_name = normalize_field_name(key)
+            op_ref = generate_op_reference(vault_name, item_name, field_name)
+            outfile.write(f'{key}="{op_ref}"\n')
+        else:
+            # Keep non-secrets, comments, empty lines, and unknown lines as-is
+            outfile.write(original)
+
+
 def convert_env_to_template(env_content, vault_name, item_name):
     """
     Convert .env file content to .env.tpl template.
@@ -128,28 +158,9 @@ def convert_env_to_template(env_content, vault_name, item_name):
     Returns:
         Converted template content
     """
-    lines = env_content.splitlines(keepends=True)
-    output_lines = []
-
-    for line in lines:
-        line_type, key, value, original = parse_env_line(line)
-
-        if line_type == 'variable':
-            if is_secret_key(key):
-                # Replace secret value with op:// reference
-                field_name = normalize_field_name(key)
-                op_ref = generate_op_reference(vault_name, item_name, field_name)
-                # Preserve original line format but replace value
-                new_line = f'{key}="{op_ref}"\n'
-                output_lines.append(new_line)
-            else:
-                # Keep non-secret variables as-is
-                output_lines.append(original)
-        else:
-            # Preserve comments, empty lines, and unknown lines
-            output_lines.append(original)
-
-    return ''.join(output_lines)
+    output = io.StringIO()
+    convert_env_stream(env_content.splitlines(keepends=True), output, vault_name, item_name)
+    return output.getvalue()
 
 
 def main():
@@ -193,24 +204,25 @@ def main():
         else:
             output_path = env_path.parent / f'{env_path.name}.tpl'
 
-    # Read input file
-    print(f"🔍 Reading {env_path}...")
-    try:
-        env_content = env_path.read_text()
-    except Exception as e:
-        print(f"❌ Error reading file: {e}")
+    # The template replaces the output file, so it must never be the source
+    if output_path.resolve() == env_path.resolve():
+        print(f"❌ Error: Output would overwrite the input file: {output_path}")
         sys.exit(1)
 
-    # Convert to template
+    # Convert line by line into a staging file next to the output; os.replace()
+    # only swaps it in once the whole input was read, so a read or decode error
+    # never leaves a truncated template behind
+    print(f"🔍 Reading {env_path}...")
     print(f"🔄 Converting to template...")
-    template_content = convert_env_to_template(env_content, args.vault_name, args.item_name)
-
-    # Write output file
     print(f"📝 Writing {output_path}...")
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
     try:
-        output_path.write_text(template_content)
+        with env_path.open('r') as fin, tmp_path.open('w') as fout:
+            convert_env_stream(fin, fout, args.vault_name, args.item_name)
+        os.replace(tmp_path, output_path)
     except Exception as e:
-        print(f"❌ Error writing file: {e}")
+        tmp_path.unlink(missing_ok=True)
+        print(f"❌ Error converting file: {e}")
         sys.exit(1)
 
     print(f"✅ Template created successfully!")
@@ -9,10 +9,30 @@ Podporuje:
 - Různé GitHub URL formáty
 """
 
+import configparser
+import functools
+import os
 import re
 import subprocess
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
+
+
+# Vault pro všechny auto-detekované projekty
+VAULT_NAME = "gh-projects"
+
+# HTTPS (https://github.com/user/repo.git) i SSH (git@github.com:user/repo.git) v jednom průchodu,
+# volitelné koncové lomítko (https://github.com/user/repo/)
+_GITHUB_URL_RE = re.compile(
+    r'(?:https?://github\.com/|git@github\.com:)([^/]+)/([^/]+?)(?:\.git)?/?\Z'
+).match
+
+# Levný test prefixu před regexem - ne-GitHub URL regex vůbec nespustí
+_GITHUB_URL_PREFIXES = ('https://github.com/', 'git@github.com:', 'http://github.com/')
+
+# GIT_UTILS_CACHE=0 vypne cache git root / remote lookupů (např. když skript
+# v jednom procesu mění remote nebo zakládá repozitáře)
+_CACHE_ENABLED = os.environ.get('GIT_UTILS_CACHE', '1') != '0'
 
 
 class GitRemoteError(Exception):
@@ -32,21 +52,42 @@ def find_git_root(start_path: Path) -> Optional[Path]:
     Returns:
         Path k git root nebo None pokud nenalezeno
     """
-    current = Path(start_path).resolve()
+    return _git_root_for(os.path.realpath(os.fspath(start_path)))
+
+
+def _git_root_for(real_dir: str) -> Optional[Path]:
+    """find_git_root() pro už resolved adresář (string) - bez dalšího realpath."""
+    if not _CACHE_ENABLED:
+        return _find_git_root.__wrapped__(real_dir)
+    return _find_git_root(real_dir)
+
+
+@functools.lru_cache(maxsize=None)
+def _find_git_root(start_path: str) -> Optional[Path]:
+    """find_git_root() s cache podle resolved cesty (sourozenecké .env sdílí výsledek)."""
+    # Práce se stringy: žádné Path objekty na úroveň, jeden lstat na .git
+    current = start_path
 
-    while current != current.parent:
-        git_dir = current / '.git'
-        if git_dir.exists():
-            return current
-        current = current.parent
+    while True:
+        if os.path.lexists(os.path.join(current, '.git')):
+            return Path(current)
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
 
-    return None
+
+# Pro izolaci testů: find_git_root.cache_clear()
+find_git_root.cache_clear = _find_git_root.cache_clear
 
 
 def get_git_remote(repo_root: Path, remote_name: str = 'origin') -> Optional[str]:
     """
     Získá URL git remote z repozitáře.
 
+    URL čte přímo z git config souboru; `git config` spouští jen jako
+    fallback pro konfigurace, které neumí přečíst (např. include).
+
     Args:
         repo_root: Cesta k root git repozitáře
         remote_name: Název remote (default: 'origin')
@@ -54,23 +95,109 @@ def get_git_remote(repo_root: Path, remote_name: str = 'origin') -> Optional[str
     Returns:
         URL remote nebo None pokud neexistuje
     """
+    return _remote_for(os.path.realpath(os.fspath(repo_root)), remote_name)
+
+
+def _remote_for(real_root: str, remote_name: str = 'origin') -> Optional[str]:
+    """get_git_remote() pro už resolved root (string) - bez dalšího realpath."""
+    if not _CACHE_ENABLED:
+        return _get_git_remote.__wrapped__(real_root, remote_name)
+    return _get_git_remote(real_root, remote_name)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_git_remote(repo_root: str, remote_name: str) -> Optional[str]:
+    """get_git_remote() s cache - jeden git proces na repozitář a remote."""
+    # Běžný případ: URL přímo z config souboru, bez spouštění git procesu
+    try:
+        return _read_config_remote(repo_root, remote_name)
+    except (LookupError, OSError, UnicodeDecodeError, configparser.Error):
+        pass  # Exotická konfigurace - fallback na git
+
     try:
         result = subprocess.run(
             ['git', 'config', '--get', f'remote.{remote_name}.url'],
             cwd=repo_root,
-            capture_output=True,
-            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,  # varování gitu nepotřebujeme bufferovat
             timeout=5
         )
 
         if result.returncode == 0:
-            return result.stdout.strip()
+            # Dekódujeme až oříznuté bajty, bez text=True wrapperu
+            return result.stdout.strip().decode('utf-8', 'replace')
         return None
 
     except Exception:
         return None
 
 
+# Pro izolaci testů: get_git_remote.cache_clear()
+get_git_remote.cache_clear = _get_git_remote.cache_clear
+
+
+def _git_config_path(repo_root: str) -> Optional[str]:
+    """
+    Najde config soubor repozitáře.
+
+    Podporuje:
+    - .git adresář → .git/config
+    - .git soubor (submodule) → "gitdir: <cesta>" → <cesta>/config
+    - worktree → <gitdir>/commondir → <commondir>/config
+    """
+    git_dir = os.path.join(repo_root, '.git')
+
+    if os.path.isfile(git_dir):
+        with open(git_dir, encoding='utf-8') as f:
+            line = f.readline().strip()
+        if not line.startswith('gitdir:'):
+            return None
+        git_dir = os.path.join(repo_root, line[len('gitdir:'):].strip())
+
+    commondir_file = os.path.join(git_dir, 'commondir')
+    if os.path.isfile(commondir_file):
+        with open(commondir_file, encoding='utf-8') as f:
+            git_dir = os.path.join(git_dir, f.read().strip())
+
+    config_path = os.path.join(git_dir, 'config')
+    return config_path if os.path.isfile(config_path) else None
+
+
+def _read_config_remote(repo_root: str, remote_name: str) -> Optional[str]:
+    """
+    Přečte URL remote z git config souboru (bez spouštění git).
+
+    Returns:
+        URL remote nebo None pokud remote v configu není
+
+    Raises:
+        LookupError: Config nenalezen nebo používá include (nutný fallback na git)
+    """
+    config_path = _git_config_path(repo_root)
+    if config_path is None:
+        raise LookupError(f"No git config found for {repo_root}")
+
+    parser = configparser.ConfigParser(
+        strict=False,
+        interpolation=None,
+        allow_no_value=True,
+        comment_prefixes=('#', ';'),
+        inline_comment_prefixes=('#', ';'),
+    )
+    parser.read(config_path, encoding='utf-8')
+
+    # [include] / [includeIf] může remote definovat jinde - to umí jen git
+    if any(section.lower().startswith('include') for section in parser.sections()):
+        raise LookupError(f"Git config uses includes: {config_path}")
+
+    url = parser.get(f'remote "{remote_name}"', 'url', fallback=None)
+    if url and len(url) >= 2 and url[0] == url[-1] == '"':
+        url = url[1:-1]
+    return url or None
+
+
+# Stejná URL se v batch režimu (monorepo) opakuje - výsledek stačí spočítat jednou
+@functools.lru_cache(maxsize=1024)
 def parse_github_url(url: str) -> Tuple[str, str]:
     """
     Parsuje GitHub URL na (user, repo).
@@ -80,6 +207,7 @@ def parse_github_url(url: str) -> Tuple[str, str]:
     - https://github.com/user/repo
     - git@github.com:user/repo.git
     - git@github.com:user/repo
+    - https://github.com/user/repo/ (koncové lomítko)
 
     Args:
         url: GitHub URL
@@ -96,17 +224,10 @@ def parse_github_url(url: str) -> Tuple[str, str]:
     # Normalize URL
     url = url.strip()
 
-    # HTTPS format: https://github.com/user/repo.git
-    https_match = re.match(r'https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?$', url)
-    if https_match:
-        user, repo = https_match.groups()
-        return user, repo
-
-    # SSH format: git@github.com:user/repo.git
-    ssh_match = re.match(r'git@github\.com:([^/]+)/([^/]+?)(?:\.git)?$', url)
-    if ssh_match:
-        user, repo = ssh_match.groups()
-        return user, repo
+    if url.startswith(_GITHUB_URL_PREFIXES):
+        match = _GITHUB_URL_RE(url)
+        if match:
+            return match.group(1), match.group(2)
 
     raise GitRemoteError(f"Not a valid GitHub URL: {url}")
 
@@ -129,34 +250,30 @@ def relative_path_to_pattern(env_path: Path, git_root: Path) -> str:
     Returns:
         Pattern string pro item name
     """
-    rel_path = env_path.relative_to(git_root)
+    return _parts_to_pattern(_relative_parts(os.fspath(env_path), os.fspath(git_root)))
 
-    # Speciální případ: .env v root
-    if str(rel_path) == '.env':
-        return 'root'
 
-    # Získej parent directory a filename
-    parent = rel_path.parent
-    filename = rel_path.name
+def _relative_parts(env_s: str, root_s: str) -> list:
+    """Části cesty env_s relativně k root_s - čistě stringově, bez pathlib."""
+    prefix = root_s if root_s.endswith(os.sep) else root_s + os.sep
+    if env_s.startswith(prefix):
+        # Běžný případ: prostý ořez prefixu
+        return env_s[len(prefix):].split(os.sep)
+    # Relativní nebo nenormalizované cesty
+    return os.path.relpath(env_s, root_s).split(os.sep)
 
-    # Převeď directory path: "/" → "__"
-    if str(parent) == '.':
-        parent_pattern = ''
-    else:
-        parent_pattern = str(parent).replace('/', '__')
 
-    # Převeď filename: .env → env, .env.local → env.local
-    if filename == '.env':
-        file_pattern = 'env'
-    else:
-        # .env.local → env.local, .env.production → env.production
-        file_pattern = filename.replace('.env', 'env')
+def _parts_to_pattern(parts) -> str:
+    """Pattern z částí relativní cesty (list stringů) - bez Path objektů."""
+    # Speciální případ: .env v root
+    if len(parts) == 1 and parts[0] == '.env':
+        return 'root'
 
-    # Složení
-    if parent_pattern:
-        return f"{parent_pattern}__{file_pattern}"
-    else:
-        return file_pattern
+    # Adresáře: "/" → "__", filename: .env → env, .env.local → env.local
+    # (jen první výskyt; běžný případ .env* je prostý slice)
+    fname = parts[-1]
+    file_pattern = fname[1:] if fname[:4] == '.env' else fname.replace('.env', 'env', 1)
+    return '__'.join((*parts[:-1], file_pattern))
 
 
 def get_1password_names(env_path: Path) -> Tuple[str, str]:
@@ -192,16 +309,75 @@ def get_1password_names(env_path: Path) -> Tuple[str, str]:
         >>> get_1password_names(Path("/path/monorepo/apps/web/.env"))
         ('gh-projects', 'testorg__monorepo__apps__web__env')
     """
+    # Cestu resolvujeme jednou; git root i pattern pracují se stejným stringem
+    env_abs = os.path.realpath(os.fspath(env_path))
+
     # 1. Najdi git root (nejbližší .git)
-    git_root = find_git_root(env_path.parent)
+    git_root = _require_git_root(env_path, env_abs)
+
+    # 2.-4. GitHub remote → user/repo
+    user, repo = _github_user_repo(git_root)
+
+    # 5. Vytvoř relativní cestu pattern
+    path_pattern = _env_pattern(env_abs, git_root)
+
+    # 6. Vault a item name
+    return VAULT_NAME, f"{user}__{repo}__{path_pattern}"
+
+
+def get_1password_names_batch(env_paths: Iterable[Path]) -> List[Tuple[str, str]]:
+    """
+    Odvodí 1Password vault a item name pro více .env souborů najednou.
+
+    Remote URL a user/repo se vyhodnotí jednou pro každý git root, per soubor
+    se počítá jen path pattern (typicky výstup find_env_files.py v monorepu).
+
+    Args:
+        env_paths: Cesty k .env souborům
+
+    Returns:
+        List (vault_name, item_name) ve stejném pořadí jako env_paths
+
+    Raises:
+        GitRemoteError: Pokud některý soubor nemá git repo nebo GitHub remote
+    """
+    repos: Dict[Path, Tuple[str, str]] = {}
+    names = []
+
+    for env_path in env_paths:
+        env_abs = os.path.realpath(os.fspath(env_path))
+        git_root = _require_git_root(env_path, env_abs)
+
+        if git_root not in repos:
+            repos[git_root] = _github_user_repo(git_root)
+        user, repo = repos[git_root]
+
+        path_pattern = _env_pattern(env_abs, git_root)
+        names.append((VAULT_NAME, f"{user}__{repo}__{path_pattern}"))
+
+    return names
+
+
+def _require_git_root(env_path: Path, env_abs: str) -> Path:
+    """Najde git root pro .env soubor (env_abs = resolved cesta), jinak vyhodí GitRemoteError."""
+    git_root = _git_root_for(os.path.dirname(env_abs))
     if not git_root:
         raise GitRemoteError(
             f"No git repository found for {env_path}\n"
             "Projects without git are not supported."
         )
+    return git_root
 
-    # 2. Získej GitHub remote
-    remote_url = get_git_remote(git_root)
+
+def _env_pattern(env_abs: str, git_root: Path) -> str:
+    """Path pattern pro resolved .env cestu uvnitř git_root."""
+    return _parts_to_pattern(_relative_parts(env_abs, os.fspath(git_root)))
+
+
+def _github_user_repo(git_root: Path) -> Tuple[str, str]:
+    """Získá (user, repo) z GitHub remote 'origin' daného git rootu."""
+    # git_root pochází z _find_git_root, je tedy už resolved
+    remote_url = _remote_for(os.fspath(git_root))
     if not remote_url:
         raise GitRemoteError(
             f"No git remote 'origin' found in {git_root}\n"
@@ -212,31 +388,22 @@ def get_1password_names(env_path: Path) -> Tuple[str, str]:
             "  git remote add origin https://github.com/user/repo.git"
         )
 
-    # 3. Ověř že je to GitHub URL
+    # Ověř že je to GitHub URL
     if 'github.com' not in remote_url:
         raise GitRemoteError(
             f"Remote URL is not GitHub: {remote_url}\n"
             "Only GitHub remotes are currently supported."
         )
 
-    # 4. Parsuj user/repo
+    # Parsuj user/repo
     try:
-        user, repo = parse_github_url(remote_url)
+        return parse_github_url(remote_url)
     except GitRemoteError as e:
         raise GitRemoteError(
             f"Failed to parse GitHub URL: {remote_url}\n"
             f"Error: {e}"
         )
 
-    # 5. Vytvoř relativní cestu pattern
-    path_pattern = relative_path_to_pattern(env_path, git_root)
-
-    # 6. Vault a item name
-    vault = "gh-projects"
-    item = f"{user}__{repo}__{path_pattern}"
-
-    return vault, item
-
 
 if __name__ == "__main__":
     # Testovací příklady
@@ -6,7 +6,8 @@ This script performs a complete migration of secrets from a .env file to 1Passwo
 1. Validates 1Password CLI setup
 2. Parses .env file and detects secrets
 3. Creates or updates 1Password item with secrets
-4. Generates .env.tpl template
+4. Generates a <env-file>.tpl template next to it (.env -> .env.tpl,
+   .env.local -> .env.local.tpl)
 5. Backs up original .env file (optional)
 6. Updates .gitignore
 
@@ -27,6 +28,9 @@ Usage:
     # Manual mode - specify vault and item explicitly
     python3 migrate_env_to_1password.py <env-file> <vault> <item-name> [options]
 
+    # Multi-file mode - migrate several .env files in parallel (auto naming)
+    python3 migrate_env_to_1password.py --files <env-file> [<env-file> ...] [options]
+
 Arguments:
     env-file: Path to .env file to migrate
     vault: 1Password vault name (required if not --auto)
@@ -34,6 +38,7 @@ Arguments:
 
 Options:
     --auto: Automatically detect vault/item from GitHub remote
+    --files: Migrate several .env files in parallel (implies --auto)
     --backup: Create .env.backup before migration
     --dry-run: Show what would be done without making changes
 
@@ -43,13 +48,20 @@ Examples:
 """
 
 import argparse
+import functools
+import io
 import json
 import os
 import re
 import shutil
+import stat
 import subprocess
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import List, Optional
 
 # Add scripts directory to Python path for git_utils import
 _scripts_dir = Path(__file__).parent
@@ -69,16 +81,25 @@ except ImportError:
 
 
 # Secret detection keywords
-SECRET_KEYWORDS = [
-    'PASSWORD', 'SECRET', 'KEY', 'TOKEN',
-    'CREDENTIAL', 'PRIVATE', 'AUTH',
-]
+# Ordered by how often they hit in real .env files ('KEY' alone covers
+# API_KEY, SECRET_KEY, PRIVATE_KEY, ...), so the scan usually stops early
+SECRET_KEYWORDS = (
+    'KEY', 'TOKEN', 'SECRET', 'PASSWORD',
+    'AUTH', 'CREDENTIAL', 'PRIVATE',
+)
+
+# One alternation over all keywords - scanned in C instead of a Python loop,
+# case-insensitive so keys need no upper() copy
+_SECRET_RE = re.compile('|'.join(SECRET_KEYWORDS), re.IGNORECASE).search
+
+# KEY=value line, compiled once at module level (match() anchors at the start;
+# input is a single stripped line) - same pattern as generate_env_template.py
+_VAR_RE = re.compile(r'([A-Za-z_][A-Za-z0-9_]*)=(.*)').match
 
 
 def is_secret_key(key):
     """Check if environment variable key represents a secret."""
-    key_upper = key.upper()
-    return any(keyword in key_upper for keyword in SECRET_KEYWORDS)
+    return _SECRET_RE(key) is not None
 
 
 def normalize_field_name(key):
@@ -86,44 +107,63 @@ def normalize_field_name(key):
     return key.lower()
 
 
+@dataclass
+class EnvData:
+    """
+    Parsed .env file as parallel per-line arrays.
+
+    keys[i] and values[i] are None for comments, blank and unparsable lines;
+    is_secret[i] is computed once during parsing.
+    """
+    raw_lines: List[str] = field(default_factory=list)
+    keys: List[Optional[str]] = field(default_factory=list)
+    values: List[Optional[str]] = field(default_factory=list)
+    is_secret: List[bool] = field(default_factory=list)
+
+
 def parse_env_file(env_path):
     """
-    Parse .env file and extract variables.
+    Parse .env file and classify variables in a single pass.
 
     Args:
         env_path: Path to .env file
 
     Returns:
-        Dict of {key: value} pairs
+        EnvData with one entry per line of the file
     """
-    variables = {}
-    content = env_path.read_text()
+    data = EnvData()
+    # Raw bytes decoded once as UTF-8: no locale lookup and no newline
+    # translation layer, line endings are kept exactly as in the file
+    content = env_path.read_bytes().decode('utf-8')
 
-    for line in content.splitlines():
+    for line in content.splitlines(keepends=True):
+        key = value = None
         stripped = line.strip()
-        if not stripped or stripped.startswith('#'):
-            continue
-
-        match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$', stripped)
-        if match:
-            key = match.group(1)
-            value = match.group(2).strip()
-            # Remove quotes if present
-            if value.startswith('"') and value.endswith('"'):
-                value = value[1:-1]
-            elif value.startswith("'") and value.endswith("'"):
-                value = value[1:-1]
-            variables[key] = value
-
-    return variables
-
-
-def detect_secrets(variables):
+        if stripped and not stripped.startswith('#'):
+            match = _VAR_RE(stripped)
+            if match:
+                key = match.group(1)
+                value = match.group(2).strip()
+                # Remove quotes if present
+                if value.startswith('"') and value.endswith('"'):
+                    value = value[1:-1]
+                elif value.startswith("'") and value.endswith("'"):
+                    value = value[1:-1]
+
+        data.raw_lines.append(line)
+        data.keys.append(key)
+        data.values.append(value)
+        data.is_secret.append(key is not None and is_secret_key(key))
+
+    return data
+
+
+def detect_secrets(env_data):
     """
     Separate secrets from non-secrets.
 
     Args:
-        variables: Dict of env variables
+        env_data: EnvData from parse_env_file()
 
     Returns:
         Tuple of (secrets_dict, non_secrets_dict)
@@ -131,8 +171,11 @@ def detect_secrets(variables):
     secrets = {}
     non_secrets = {}
 
-    for key, value in variables.items():
-        if is_secret_key(key):
+    # Later duplicates overwrite earlier values, like a plain dict parse
+    for key, value, secret in zip(env_data.keys, env_data.values, env_data.is_secret):
+        if key is None:
+            continue
+        if secret:
             secrets[key] = value
         else:
             non_secrets[key] = value
@@ -140,26 +183,116 @@ def detect_secrets(variables):
     return secrets, non_secrets
 
 
-def validate_op_cli():
+# Cap concurrent op CLI processes in multi-file mode (op daemon / API rate limits)
+_OP_SEMAPHORE = threading.Semaphore(4)
+
+# Signed-in sessions validated by `op whoami`: OP_* environment -> account UUID
+_OP_AUTH_CACHE = {}
+
+
+def _op_auth_key():
+    """Cache key for the current 1Password session (OP_SESSION_*, OP_ACCOUNT, ...)."""
+    return tuple(sorted(
+        (name, value) for name, value in os.environ.items() if name.startswith('OP_')
+    ))
+
+
+def run_op(cmd, **kwargs):
+    """
+    Run an op CLI command through the shared concurrency limit.
+
+    Once validate_op_cli() has seen a signed-in session, every call is pinned
+    to that account with --account, so op reuses the validated session instead
+    of resolving the default account again on each invocation.
+    """
+    account = _OP_AUTH_CACHE.get(_op_auth_key())
+    if account:
+        cmd = [cmd[0], "--account", account] + list(cmd[1:])
+    # Never wait on an interactive prompt; callers pick which outputs to keep
+    kwargs.setdefault('stdin', subprocess.DEVNULL)
+    with _OP_SEMAPHORE:
+        return subprocess.run(cmd, **kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def _which(cmd, path):
+    """shutil.which() memoized per $PATH value."""
+    return shutil.which(cmd, path=path)
+
+
+def validate_op_cli(out=None):
     """Validate 1Password CLI is installed and signed in."""
-    # Check if op is available
-    if not shutil.which("op"):
-        print("❌ 1Password CLI not found. Please install it first.")
+    # Already validated for this session in this process
+    key = _op_auth_key()
+    if key in _OP_AUTH_CACHE:
+        return True
+
+    # Check if op is available (PATH scan only once per $PATH)
+    if not _which("op", os.environ.get("PATH")):
+        print("❌ 1Password CLI not found. Please install it first.", file=out)
         return False
 
-    # Check if signed in
+    # Check if signed in (and remember which account the session belongs to)
     try:
-        result = subprocess.run(
-            ["op", "whoami"],
+        result = run_op(
+            ["op", "whoami", "--format=json"],
             capture_output=True,
             timeout=5
         )
-        return result.returncode == 0
+        if result.returncode != 0:
+            return False
     except Exception:
         return False
 
+    try:
+        account = json.loads(result.stdout).get("account_uuid")
+    except (ValueError, AttributeError):
+        account = None
+    _OP_AUTH_CACHE[key] = account
+    return True
+
+
+# Item titles per vault, listed once per run instead of one op item get per file.
+# vault -> Future: the first worker lists the vault, others for the same vault
+# wait on its result; the lock only guards the dict, never the op call
+_VAULT_ITEMS_CACHE = {}
+_VAULT_ITEMS_LOCK = threading.Lock()
+
+
+def _list_vault_items(vault):
+    """Set of item titles in vault, or None if it can't be listed."""
+    try:
+        result = run_op(
+            ["op", "item", "list", "--vault", vault, "--format=json"],
+            capture_output=True,
+            timeout=15
+        )
+        if result.returncode == 0:
+            return {item.get("title") for item in json.loads(result.stdout)}
+    except Exception:
+        pass
+    return None
+
+
+def _vault_items(vault):
+    """Return the set of item titles in vault, or None if it can't be listed."""
+    with _VAULT_ITEMS_LOCK:
+        future = _VAULT_ITEMS_CACHE.get(vault)
+        owner = future is None
+        if owner:
+            future = _VAULT_ITEMS_CACHE[vault] = Future()
+    if owner:
+        future.set_result(_list_vault_items(vault))
+    return future.result()
+
 
-def create_or_update_1password_item(vault, item_name, secrets, dry_run=False):
+def field_names_for(secrets):
+    """Map each secret key to its 1Password field name, computed once per run."""
+    return {key: normalize_field_name(key) for key in secrets}
+
+
+def create_or_update_1password_item(vault, item_name, secrets, dry_run=False, field_names=None,
+                                    out=None):
     """
     Create or update 1Password item with secrets.
 
@@ -168,137 +301,154 @@ def create_or_update_1password_item(vault, item_name, secrets, dry_run=False):
         item_name: Item name
         secrets: Dict of secret key-value pairs
         dry_run: If True, only print what would be done
+        field_names: Optional {key: field} from field_names_for()
+        out: Stream for progress output (default: sys.stdout)
 
     Returns:
         True if successful, False otherwise
     """
+    if field_names is None:
+        field_names = field_names_for(secrets)
+
     if dry_run:
-        print(f"🔐 [DRY-RUN] Would create/update 1Password item: {item_name} in vault {vault}")
+        print(f"🔐 [DRY-RUN] Would create/update 1Password item: {item_name} in vault {vault}", file=out)
         for key in secrets.keys():
-            field = normalize_field_name(key)
-            print(f"  ├─ {key} → {field}")
+            print(f"  ├─ {key} → {field_names[key]}", file=out)
         return True
 
-    # Check if item already exists
-    item_exists = False
-    try:
-        result = subprocess.run(
-            ["op", "item", "get", item_name, "--vault", vault],
-            capture_output=True,
-            timeout=10
-        )
-        item_exists = (result.returncode == 0)
-    except Exception:
-        pass
+    # Check if item already exists (one vault listing per run, op item get as fallback)
+    titles = _vault_items(vault)
+    if titles is not None:
+        item_exists = item_name in titles
+    else:
+        item_exists = False
+        try:
+            result = run_op(
+                ["op", "item", "get", item_name, "--vault", vault],
+                stdout=subprocess.DEVNULL,  # only the return code matters
+                stderr=subprocess.DEVNULL,
+                timeout=10
+            )
+            item_exists = (result.returncode == 0)
+        except Exception:
+            pass
 
     if item_exists:
-        print(f"📝 Updating existing item: {item_name}")
-        # Update existing item
-        for key, value in secrets.items():
-            field = normalize_field_name(key)
-            try:
-                subprocess.run(
-                    ["op", "item", "edit", item_name,
-                     "--vault", vault,
-                     f"{field}[password]={value}"],
-                    check=True,
-                    capture_output=True,
-                    timeout=10
-                )
-                print(f"  ├─ {key} → Updated in 1Password")
-            except subprocess.CalledProcessError as e:
-                print(f"  ├─ {key} → ❌ Error: {e}")
-                return False
+        print(f"📝 Updating existing item: {item_name}", file=out)
+        # Update existing item - all fields in one op call instead of one per secret
+        fields = [f"{field_names[key]}[password]={value}" for key, value in secrets.items()]
+
+        try:
+            cmd = ["op", "item", "edit", item_name,
+                   "--vault", vault] + fields
+            run_op(
+                cmd,
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=15 + len(secrets)
+            )
+            for key in secrets.keys():
+                print(f"  ├─ {key} → Updated in 1Password", file=out)
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error updating item: {e}", file=out)
+            return False
     else:
-        print(f"🔐 Creating new item: {item_name} in vault {vault}")
+        print(f"🔐 Creating new item: {item_name} in vault {vault}", file=out)
         # Create new item with all secrets
-        fields = []
-        for key, value in secrets.items():
-            field = normalize_field_name(key)
-            fields.append(f"{field}[password]={value}")
+        fields = [f"{field_names[key]}[password]={value}" for key, value in secrets.items()]
 
         try:
             cmd = ["op", "item", "create",
                    "--category", "password",
                    "--title", item_name,
                    "--vault", vault] + fields
-            subprocess.run(
+            run_op(
                 cmd,
                 check=True,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=15
             )
+            if titles is not None:
+                titles.add(item_name)
             for key in secrets.keys():
-                print(f"  ├─ {key} → Added to 1Password")
+                print(f"  ├─ {key} → Added to 1Password", file=out)
         except subprocess.CalledProcessError as e:
-            print(f"❌ Error creating item: {e}")
+            print(f"❌ Error creating item: {e}", file=out)
             return False
 
     return True
 
 
-def generate_template(env_path, vault, item_name):
+def generate_template(env_path, env_data, vault, item_name, pending=None, field_names=None):
     """
-    Generate .env.tpl template file.
+    Generate the template file next to env_path (.env -> .env.tpl,
+    .env.local -> .env.local.tpl).
 
     Args:
         env_path: Path to original .env file
+        env_data: EnvData from parse_env_file()
         vault: Vault name
         item_name: Item name
+        pending: Optional PendingWrites; the template is staged, not written
+        field_names: Optional {key: field} from field_names_for()
 
     Returns:
         Path to generated template
     """
-    template_path = env_path.parent / ".env.tpl"
-
-    # Use generate_env_template.py logic inline
-    content = env_path.read_text()
-    lines = content.splitlines(keepends=True)
-    output_lines = []
-
-    for line in lines:
-        stripped = line.strip()
-
-        # Empty or comment lines
-        if not stripped or stripped.startswith('#'):
-            output_lines.append(line)
-            continue
-
-        # Variable lines
-        match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$', stripped)
-        if match:
-            key = match.group(1)
-            if is_secret_key(key):
-                field = normalize_field_name(key)
-                op_ref = f'op://{vault}/{item_name}/{field}'
-                output_lines.append(f'{key}="{op_ref}"\n')
+    # One template per source file, so several .env files in the same
+    # directory (--files) don't overwrite each other's template
+    template_path = env_path.with_name(env_path.name + ".tpl")
+
+    # Write line by line instead of joining the whole template in memory;
+    # newline='' because raw lines already carry their original endings
+    if pending is not None:
+        out = pending.open_template(template_path)
+    else:
+        out = template_path.open('w', encoding='utf-8', newline='', buffering=1 << 16)
+    with out:
+        for line, key, secret in zip(env_data.raw_lines, env_data.keys, env_data.is_secret):
+            # Secret variables become op:// references, everything else is kept as-is
+            if secret:
+                field_name = field_names[key] if field_names else normalize_field_name(key)
+                op_ref = f'op://{vault}/{item_name}/{field_name}'
+                ending = line[len(line.rstrip('\r\n')):] or '\n'
+                out.write(f'{key}="{op_ref}"{ending}')
             else:
-                output_lines.append(line)
-        else:
-            output_lines.append(line)
+                out.write(line)
+        if pending is not None:
+            # Staged data must be on disk before commit() renames it into place,
+            # otherwise a crash can leave an empty template behind
+            out.flush()
+            os.fsync(out.fileno())
 
-    template_path.write_text(''.join(output_lines))
     return template_path
 
 
-def backup_env_file(env_path, dry_run=False):
+def backup_env_file(env_path, dry_run=False, out=None):
     """Create backup of .env file."""
     backup_path = env_path.parent / ".env.backup"
 
     try:
-        shutil.copy2(env_path, backup_path)
+        # copyfile() takes the kernel fast path (sendfile / clonefile);
+        # only mode and timestamps are carried over, not the full copystat()
+        shutil.copyfile(env_path, backup_path)
+        st = env_path.stat()
+        os.chmod(backup_path, stat.S_IMODE(st.st_mode))  # keep e.g. 0600 on secrets
+        os.utime(backup_path, ns=(st.st_atime_ns, st.st_mtime_ns))
         if dry_run:
-            print(f"💾 [DRY-RUN] Backed up {env_path} to {backup_path}")
+            print(f"💾 [DRY-RUN] Backed up {env_path} to {backup_path}", file=out)
         else:
-            print(f"💾 Backed up original to {backup_path}")
+            print(f"💾 Backed up original to {backup_path}", file=out)
         return True
     except Exception as e:
-        print(f"❌ Error creating backup: {e}")
+        print(f"❌ Error creating backup: {e}", file=out)
         return False
 
 
-def update_gitignore(env_path, dry_run=False):
-    """Update .gitignore to exclude .env files."""
+def update_gitignore(env_path, dry_run=False, pending=None, out=None):
+    """Update .gitignore to exclude .env files (staged in pending, if given)."""
     gitignore_path = env_path.parent / ".gitignore"
 
     entries_to_add = [
@@ -314,55 +464,286 @@ def update_gitignore(env_path, dry_run=False):
     ]
 
     # Read existing gitignore or create new
-    if gitignore_path.exists():
+    if pending is not None:
+        content = pending.gitignore_content()
+    elif gitignore_path.exists():
         content = gitignore_path.read_text()
     else:
         content = ""
 
-    # Check if .env is already in gitignore
-    if ".env" in content:
+    # Check if .env is already in gitignore - whole lines only, so comments or
+    # patterns like node_modules/.env.sample don't count as covered
+    existing = {line.strip() for line in content.splitlines()}
+    if ".env" in existing and ".env.backup" in existing:
         if dry_run:
-            print(f"📋 [DRY-RUN] .gitignore already contains .env entries")
+            print(f"📋 [DRY-RUN] .gitignore already contains .env entries", file=out)
         else:
-            print(f"📋 .gitignore already contains .env entries")
+            print(f"📋 .gitignore already contains .env entries", file=out)
         return True
 
-    # Append our entries
+    # Append only our entries instead of rewriting the whole file
+    block = '\n'.join(entries_to_add) + '\n'
     if content and not content.endswith('\n'):
-        content += '\n'
+        block = '\n' + block
 
-    content += '\n'.join(entries_to_add) + '\n'
-    gitignore_path.write_text(content)
+    if pending is not None:
+        pending.add_gitignore_append(block)
+    else:
+        with gitignore_path.open('a') as f:
+            f.write(block)
 
     if dry_run:
-        print(f"📋 [DRY-RUN] Updated {gitignore_path}")
+        print(f"📋 [DRY-RUN] Updated {gitignore_path}", file=out)
     else:
-        print(f"📋 Updated {gitignore_path}")
+        print(f"📋 Updated {gitignore_path}", file=out)
     return True
 
 
-def main():
-    """Main migration function."""
+class PendingWrites:
+    """
+    Template and .gitignore writes for one directory, applied by commit().
+
+    In multi-file mode every .env in a directory shares one .gitignore.
+    Staging the writes means later files see earlier .gitignore entries,
+    each template lands via a single os.replace(), and the directory is
+    fsynced once instead of per write.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._templates = {}
+        self._gitignore_content = None
+        self._gitignore_blocks = []
+
+    def open_template(self, template_path):
+        """Open a staging file for template_path; replaces any earlier staging."""
+        tmp_path = template_path.with_name(template_path.name + '.tmp')
+        self._templates[template_path] = tmp_path
+        return tmp_path.open('w', encoding='utf-8', newline='', buffering=1 << 16)
+
+    def gitignore_content(self):
+        """Current .gitignore content including staged appends."""
+        if self._gitignore_content is None:
+            gitignore_path = self.directory / ".gitignore"
+            self._gitignore_content = gitignore_path.read_text() if gitignore_path.exists() else ""
+        return self._gitignore_content + ''.join(self._gitignore_blocks)
+
+    def add_gitignore_append(self, block):
+        """Stage text to append to .gitignore."""
+        self._gitignore_blocks.append(block)
+
+    def commit(self):
+        """Move templates into place, append .gitignore once, fsync the directory."""
+        for template_path, tmp_path in self._templates.items():
+            os.replace(tmp_path, template_path)
+
+        if self._gitignore_blocks:
+            with (self.directory / ".gitignore").open('a') as f:
+                f.write(''.join(self._gitignore_blocks))
+
+        try:
+            dir_fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass  # Directory fsync isn't supported everywhere - best effort
+
+        self._templates.clear()
+        self._gitignore_content = None
+        self._gitignore_blocks.clear()
+
+
+def migrate_one(env_path, vault, item_name, backup=False, dry_run=False, pending=None,
+                out=None):
+    """
+    Migrate a single .env file: 1Password item, template, backup, .gitignore.
+
+    Args:
+        env_path: Absolute path to .env file
+        vault: Vault name
+        item_name: Item name
+        backup: Create .env.backup
+        dry_run: If True, don't touch 1Password
+        pending: Optional PendingWrites to stage template/.gitignore writes in
+        out: Stream for progress output (default: sys.stdout)
+
+    Returns:
+        Tuple of (ok, template_path); template_path is None when nothing was migrated
+    """
+    print(f"🔍 Reading .env file...\n", file=out)
+
+    # Parse .env file
+    try:
+        env_data = parse_env_file(env_path)
+    except Exception as e:
+        print(f"❌ Error parsing .env file: {e}", file=out)
+        return False, None
+
+    # Detect secrets
+    secrets, non_secrets = detect_secrets(env_data)
+
+    if not secrets:
+        print("⚠️  No secrets detected in .env file", file=out)
+        print("   (looking for keys containing: PASSWORD, SECRET, KEY, TOKEN, etc.)", file=out)
+        return True, None
+
+    print(f"Found {len(secrets)} secret(s) and {len(non_secrets)} non-secret variable(s)\n", file=out)
+
+    # Validate 1Password CLI (skip in dry-run)
+    if not dry_run:
+        if not validate_op_cli(out=out):
+            print("❌ 1Password CLI validation failed", file=out)
+            print("   Run: python3 scripts/validate_op_cli.py", file=out)
+            return False, None
+
+    # Field names are shared by the op calls, dry-run listing and template
+    field_names = field_names_for(secrets)
+
+    # Create/update 1Password item
+    success = create_or_update_1password_item(
+        vault,
+        item_name,
+        secrets,
+        dry_run=dry_run,
+        field_names=field_names,
+        out=out
+    )
+
+    if not success:
+        print("\n❌ Migration failed", file=out)
+        return False, None
+
+    print("\n✅ Secrets migrated to 1Password\n", file=out)
+
+    # Generate template
+    print(f"📝 Generating {env_path.name}.tpl template...", file=out)
+    template_path = generate_template(env_path, env_data, vault, item_name,
+                                      pending=pending, field_names=field_names)
+    print(f"✅ Generated {template_path}\n", file=out)
+
+    # Backup original
+    if backup:
+        backup_env_file(env_path, dry_run=dry_run, out=out)
+        print(file=out)
+
+    # Update .gitignore
+    update_gitignore(env_path, dry_run=dry_run, pending=pending, out=out)
+
+    # Final instructions
+    print("\n✅ Migration complete!\n", file=out)
+    print("Next steps:", file=out)
+    print(f"1. Review {template_path}", file=out)
+    print(f"2. Test: op inject -i {template_path} -o .env.test", file=out)
+    print(f"3. Verify: diff .env .env.test", file=out)
+    print(f"4. Commit {template_path} to git", file=out)
+
+    return True, template_path
+
+
+def migrate_many(env_paths, backup=False, dry_run=False):
+    """
+    Migrate several .env files in parallel (vault/item auto-detected per file).
+
+    Each file is dominated by op CLI latency, so directories are handled by a
+    thread pool; op calls themselves are capped by _OP_SEMAPHORE. Files in the
+    same directory run in one worker and share a PendingWrites, committed once.
+    Each worker writes its output into its own buffer (passed down as out=),
+    printed afterwards in input order.
+
+    Returns:
+        Number of files that failed
+    """
+    groups = {}
+    for env_path in env_paths:
+        groups.setdefault(env_path.parent, []).append(env_path)
+
+    def run(directory):
+        out = io.StringIO()
+        pending = PendingWrites(directory)
+        results = []
+        for env_path in groups[directory]:
+            try:
+                print(f"━━━ {env_path}\n", file=out)
+                vault, item_name = get_1password_names(env_path)
+                print(f"✅ Auto-detected: {vault} / {item_name}\n", file=out)
+                ok, _ = migrate_one(env_path, vault, item_name, backup=backup,
+                                    dry_run=dry_run, pending=pending, out=out)
+            except Exception as e:
+                print(f"❌ Error: {e}", file=out)
+                ok = False
+            results.append(ok)
+        try:
+            pending.commit()
+        except OSError as e:
+            print(f"❌ Error writing files in {directory}: {e}", file=out)
+            results = [False] * len(results)
+        return results, out.getvalue()
+
+    with ThreadPoolExecutor(max_workers=min(8, len(groups))) as executor:
+        group_results = list(executor.map(run, groups))
+
+    failed = 0
+    for results, output in group_results:
+        print(output)
+        failed += results.count(False)
+
+    print(f"{'✅' if not failed else '❌'} Migrated {len(env_paths) - failed}/{len(env_paths)} file(s)")
+    return failed
+
+
+def main(argv=None):
+    """
+    Main migration function.
+
+    Args:
+        argv: Command line arguments (default: sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
     parser = argparse.ArgumentParser(
         description='Migrate .env file to 1Password'
     )
-    parser.add_argument('env_file', help='Path to .env file')
+    # A single positional .env or --files, never both
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('env_file', nargs='?', help='Path to .env file')
     parser.add_argument('vault', nargs='?', help='1Password vault name (optional with --auto)')
     parser.add_argument('item_name', nargs='?', help='1Password item name (optional with --auto)')
     parser.add_argument('--auto', action='store_true',
                         help='Automatically detect vault/item from GitHub remote')
+    source.add_argument('--files', nargs='+', metavar='ENV_FILE',
+                        help='Migrate several .env files in parallel (implies --auto)')
     parser.add_argument('--backup', action='store_true',
                         help='Create .env.backup before migration')
     parser.add_argument('--dry-run', action='store_true',
                         help='Show what would be done without making changes')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    # Multi-file mode
+    if args.files:
+        env_paths = [Path(f).resolve() for f in args.files]
+        missing = [p for p in env_paths if not p.exists()]
+        if missing:
+            for env_path in missing:
+                print(f"❌ Error: File not found: {env_path}")
+            return 1
+
+        failed = migrate_many(env_paths, backup=args.backup, dry_run=args.dry_run)
+        if args.dry_run:
+            print("\n⚠️  This was a DRY RUN. No changes were made to 1Password.")
+        return 1 if failed else 0
+
+    if not args.env_file:
+        parser.error("env_file is required (or use --files)")
 
     # Validate input
     env_path = Path(args.env_file).resolve()  # Convert to absolute path
     if not env_path.exists():
         print(f"❌ Error: File not found: {env_path}")
-        sys.exit(1)
+        return 1
 
     # Determine vault and item_name
     if args.auto:
@@ -379,7 +760,7 @@ def main():
             print("  - Ensure you're in a git repository with a GitHub remote")
             print("  - Check: git remote get-url origin")
             print("  - Or use manual mode: <env-file> <vault> <item-name>")
-            sys.exit(1)
+            return 1
     else:
         # Manual mode: require vault and item_name arguments
         if not args.vault or not args.item_name:
@@ -387,76 +768,21 @@ def main():
             print("\nUsage:")
             print("  Auto mode:   python3 migrate_env_to_1password.py <env-file> --auto")
             print("  Manual mode: python3 migrate_env_to_1password.py <env-file> <vault> <item-name>")
-            sys.exit(1)
+            return 1
         vault = args.vault
         item_name = args.item_name
 
-    print(f"🔍 Reading .env file...\n")
-
-    # Parse .env file
-    try:
-        variables = parse_env_file(env_path)
-    except Exception as e:
-        print(f"❌ Error parsing .env file: {e}")
-        sys.exit(1)
-
-    # Detect secrets
-    secrets, non_secrets = detect_secrets(variables)
-
-    if not secrets:
-        print("⚠️  No secrets detected in .env file")
-        print("   (looking for keys containing: PASSWORD, SECRET, KEY, TOKEN, etc.)")
-        sys.exit(0)
-
-    print(f"Found {len(secrets)} secret(s) and {len(non_secrets)} non-secret variable(s)\n")
-
-    # Validate 1Password CLI (skip in dry-run)
-    if not args.dry_run:
-        if not validate_op_cli():
-            print("❌ 1Password CLI validation failed")
-            print("   Run: python3 scripts/validate_op_cli.py")
-            sys.exit(1)
-
-    # Create/update 1Password item
-    success = create_or_update_1password_item(
-        vault,
-        item_name,
-        secrets,
-        dry_run=args.dry_run
+    ok, template_path = migrate_one(
+        env_path, vault, item_name, backup=args.backup, dry_run=args.dry_run
     )
+    if not ok:
+        return 1
 
-    if not success:
-        print("\n❌ Migration failed")
-        sys.exit(1)
-
-    print("\n✅ Secrets migrated to 1Password\n")
-
-    # Generate template
-    print("📝 Generating .env.tpl template...")
-    template_path = generate_template(env_path, vault, item_name)
-    print(f"✅ Generated {template_path}\n")
-
-    # Backup original
-    if args.backup:
-        backup_env_file(env_path, dry_run=args.dry_run)
-        print()
-
-    # Update .gitignore
-    update_gitignore(env_path, dry_run=args.dry_run)
-
-    # Final instructions
-    print("\n✅ Migration complete!\n")
-    print("Next steps:")
-    print(f"1. Review {template_path}")
-    print(f"2. Test: op inject -i {template_path} -o .env.test")
-    print(f"3. Verify: diff .env .env.test")
-    print(f"4. Commit {template_path} to git")
-
-    if args.dry_run:
+    if args.dry_run and template_path:
         print("\n⚠️  This was a DRY RUN. No changes were made to 1Password.")
 
-    sys.exit(0)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
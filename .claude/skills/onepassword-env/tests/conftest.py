@@ -1,10 +1,33 @@
-"""Pytest fixtures pro onepassword-env skill testy."""
+"""Pytest fixtures pro onepassword-env skill testy.
 
+Testy pracují ve vlastních dočasných adresářích (temp_work_dir, tmp_path,
+tmp_path_factory). Výjimkou jsou test_migrate_auto_* v test_migrate.py, které
+zapisují .env.tpl a .gitignore přímo do sdílených git test cases. Paralelně
+přes pytest-xdist proto jen s --dist=loadfile, které drží testy jednoho
+souboru na jednom workeru:
+
+    pytest -n auto --dist=loadfile tests
+
+Session fixtures (migrated_outputs, git_test_cases_dir) se počítají jednou
+per worker.
+"""
+
+import contextlib
+import io
+import os
 import pytest
-import tempfile
 import shutil
+import subprocess
+import sys
 from pathlib import Path
 
+# Skripty jsou v scripts/ vedle tests/ - resolvujeme jednou při načtení conftestu.
+# sys.path musí být nastavený už tady: testovací moduly importují skripty
+# při collection, dřív než běží jakákoliv fixture.
+SCRIPTS_DIR = (Path(__file__).parent.parent / "scripts").resolve()
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
 
 @pytest.fixture
 def test_cases_dir():
@@ -13,23 +36,95 @@ def test_cases_dir():
 
 
 @pytest.fixture
-def temp_work_dir():
-    """Vytvoří dočasný pracovní adresář."""
-    temp_dir = tempfile.mkdtemp()
-    yield Path(temp_dir)
-    shutil.rmtree(temp_dir)
+def temp_work_dir(tmp_path_factory):
+    """Vytvoří dočasný pracovní adresář (úklid dělá pytest hromadně na konci)."""
+    return tmp_path_factory.mktemp("work", numbered=True)
 
 
 @pytest.fixture
+def stage_env():
+    """Připraví vstupní .env do pracovního adresáře - hard link místo kopie.
+
+    Migrace v testech (--dry-run) .env jen čte, takže hard link je bezpečný;
+    kopie je jen fallback (jiný filesystem, FS bez hard linků).
+    """
+    def _stage_env(src, dst_dir, name=".env"):
+        dst = dst_dir / name
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy(src, dst)
+        return dst
+    return _stage_env
+
+
+@pytest.fixture(scope="session")
 def scripts_dir():
     """Vrátí cestu ke scripts adresáři."""
-    # Předpokládá, že testy jsou v tests/ a skripty v scripts/
-    current_file = Path(__file__)
-    skill_dir = current_file.parent.parent
-    return skill_dir / "scripts"
+    return SCRIPTS_DIR
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def git_test_cases_dir():
     """Vrátí cestu k git testovacím případům."""
     return Path("/private/tmp/claude-501/-Users-chocho/737bd6b7-084b-4352-bc37-0fe1b6b26ba2/scratchpad/onepassword-env-tests/git-test-cases")
+
+
+@pytest.fixture
+def migrate():
+    """Vrátí importovaný migrate_env_to_1password modul (volání main() bez subprocesu)."""
+    import migrate_env_to_1password
+    return migrate_env_to_1password
+
+
+@pytest.fixture
+def run_migrate():
+    """Spustí migrate_env_to_1password.py jako subprocess s co nejlevnějším startem.
+
+    -S -I přeskočí site.py a PYTHON* proměnné (skript je čistě stdlib), env je
+    minimální a stdin zavřený, aby případný prompt nemohl test zablokovat.
+    """
+    env = {k: os.environ[k] for k in ("PATH", "HOME") if k in os.environ}
+
+    def _run_migrate(args, **kw):
+        return subprocess.run(
+            [sys.executable, "-S", "-I", str(SCRIPTS_DIR / "migrate_env_to_1password.py"), *args],
+            capture_output=True,
+            text=True,
+            stdin=subprocess.DEVNULL,
+            env=env,
+            **kw
+        )
+    return _run_migrate
+
+
+@pytest.fixture(scope="session")
+def migrated_outputs(tmp_path_factory):
+    """Výsledky --dry-run migrace cachované per (zdrojový .env, vault, item, flagy).
+
+    Testy, které jen kontrolují výslednou šablonu/backup, tak sdílí jeden běh
+    migrace. Vrací (exit_code, template_text, backup_text, stdout); chybějící
+    soubor je None.
+    """
+    import migrate_env_to_1password as migrate
+    cache = {}
+
+    def _run(src_env, vault, item, flags=()):
+        key = (str(src_env), vault, item, tuple(flags))
+        if key not in cache:
+            work_dir = tmp_path_factory.mktemp("migrated")
+            dest_env = work_dir / ".env"
+            shutil.copy(src_env, dest_env)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                exit_code = migrate.main([str(dest_env), vault, item, "--dry-run", *flags])
+            template = work_dir / ".env.tpl"
+            backup = work_dir / ".env.backup"
+            cache[key] = (
+                exit_code,
+                template.read_text() if template.exists() else None,
+                backup.read_text() if backup.exists() else None,
+                out.getvalue(),
+            )
+        return cache[key]
+    return _run
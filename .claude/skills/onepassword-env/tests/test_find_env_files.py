@@ -80,3 +80,84 @@ def test_find_ignores_templates(temp_work_dir, scripts_dir):
     # Měl by najít pouze .env (ne .env.tpl ani .env.example)
     assert len(data["env_files"]) == 1
     assert data["env_files"][0].endswith(".env")
+
+
+def test_find_skips_ignored_dirs(temp_work_dir, scripts_dir):
+    """Test že ignorované adresáře (node_modules, .git, ...) se neprochází."""
+    (temp_work_dir / "app" / "api").mkdir(parents=True)
+    (temp_work_dir / "app" / "api" / ".env").write_text("API_KEY=secret")
+    (temp_work_dir / "node_modules" / "pkg").mkdir(parents=True)
+    (temp_work_dir / "node_modules" / "pkg" / ".env").write_text("IGNORED=1")
+    (temp_work_dir / ".git").mkdir()
+    (temp_work_dir / ".git" / ".env").write_text("IGNORED=1")
+
+    result = subprocess.run(
+        ["python3", str(scripts_dir / "find_env_files.py"), str(temp_work_dir)],
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0
+    data = json.loads(result.stdout)
+
+    # Měl by najít pouze app/api/.env
+    assert len(data["env_files"]) == 1
+    assert data["env_files"][0].endswith("/app/api/.env")
+
+
+def test_find_does_not_follow_symlinks(temp_work_dir, scripts_dir):
+    """Test že symlinkované adresáře ani .env soubory se nenásledují."""
+    real_dir = temp_work_dir / "real"
+    real_dir.mkdir()
+    (real_dir / ".env").write_text("REAL=secret")
+    (temp_work_dir / "linked-dir").symlink_to(real_dir, target_is_directory=True)
+    (temp_work_dir / ".env.linked").symlink_to(real_dir / ".env")
+
+    result = subprocess.run(
+        ["python3", str(scripts_dir / "find_env_files.py"), str(temp_work_dir)],
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0
+    data = json.loads(result.stdout)
+
+    # Pouze real/.env - ne přes linked-dir/.env ani .env.linked
+    assert len(data["env_files"]) == 1
+    assert data["env_files"][0].endswith("/real/.env")
+
+
+def test_find_threads_matches_serial(temp_work_dir, scripts_dir):
+    """Test že --threads vrací stejný (seřazený) výsledek jako sériový průchod."""
+    (temp_work_dir / ".env").write_text("ROOT=1")
+    for name in ("a", "b", "c"):
+        sub = temp_work_dir / name / "nested"
+        sub.mkdir(parents=True)
+        (sub / ".env.local").write_text("X=1")
+    (temp_work_dir / "node_modules").mkdir()
+    (temp_work_dir / "node_modules" / ".env").write_text("IGNORED=1")
+
+    outputs = []
+    for extra in ([], ["--threads", "4"]):
+        result = subprocess.run(
+            ["python3", str(scripts_dir / "find_env_files.py"), str(temp_work_dir), *extra],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0
+        outputs.append(json.loads(result.stdout)["env_files"])
+
+    assert outputs[0] == outputs[1]
+    assert len(outputs[1]) == 4
+
+
+def test_find_unreadable_root_warns_in_both_modes(temp_work_dir, monkeypatch, capsys):
+    """Test že nečitelný root jen varuje - sériově i s vlákny, bez sys.exit."""
+    import find_env_files
+
+    def denied(path):
+        raise PermissionError(13, "Permission denied", path)
+
+    monkeypatch.setattr(find_env_files.os, "scandir", denied)
+
+    for threads in (1, 4):
+        assert find_env_files.find_env_files(temp_work_dir, threads=threads) == []
+        assert "Permission denied" in capsys.readouterr().err
@@ -1,5 +1,6 @@
 """Testy pro generate_env_template.py script."""
 
+import os
 import subprocess
 from pathlib import Path
 
@@ -131,3 +132,79 @@ def test_generate_empty_lines_preserved(test_cases_dir, temp_work_dir, scripts_d
     lines = content.splitlines()
     empty_lines = [i for i, line in enumerate(lines) if not line.strip()]
     assert len(empty_lines) > 0, "Měly by být zachovány prázdné řádky"
+
+
+def test_generate_streams_exact_output(temp_work_dir, scripts_dir):
+    """Test že šablona zachová řádky 1:1 a nahradí jen secrets."""
+    env_file = temp_work_dir / ".env"
+    env_file.write_text(
+        "# Config\n"
+        "\n"
+        "APP_NAME=MyApp\n"
+        "DB_PASSWORD=\"hunter2\"\n"
+        "not a variable\n"
+        "api_token=abc"  # Bez koncového newline
+    )
+    output_file = temp_work_dir / ".env.tpl"
+
+    result = subprocess.run(
+        [
+            "python3", str(scripts_dir / "generate_env_template.py"),
+            str(env_file), "TestVault", "TestItem",
+            "--output", str(output_file)
+        ],
+        capture_output=True,
+        text=True
+    )
+
+    assert result.returncode == 0, f"Script failed: {result.stderr}"
+    assert output_file.read_text() == (
+        "# Config\n"
+        "\n"
+        "APP_NAME=MyApp\n"
+        "DB_PASSWORD=\"op://TestVault/TestItem/db_password\"\n"
+        "not a variable\n"
+        "api_token=\"op://TestVault/TestItem/api_token\"\n"
+    )
+
+
+def test_generate_refuses_output_over_input(temp_work_dir, scripts_dir):
+    """Test že --output mířící na vstupní .env skončí chybou a .env nechá beze změny."""
+    env_file = temp_work_dir / ".env"
+    env_file.write_text("DB_PASSWORD=hunter2\n")
+
+    result = subprocess.run(
+        [
+            "python3", str(scripts_dir / "generate_env_template.py"),
+            str(env_file), "TestVault", "TestItem",
+            "--output", str(temp_work_dir / "." / ".env")
+        ],
+        capture_output=True,
+        text=True
+    )
+
+    assert result.returncode == 1
+    assert env_file.read_text() == "DB_PASSWORD=hunter2\n"
+
+
+def test_generate_keeps_old_template_on_error(temp_work_dir, scripts_dir):
+    """Test že chyba při čtení vstupu nezkrátí existující šablonu."""
+    env_file = temp_work_dir / ".env"
+    env_file.write_bytes(b"DB_PASSWORD=\xff\xfe\n")  # Nevalidní UTF-8
+    output_file = temp_work_dir / ".env.tpl"
+    output_file.write_text("OLD=template\n")
+
+    result = subprocess.run(
+        [
+            "python3", str(scripts_dir / "generate_env_template.py"),
+            str(env_file), "TestVault", "TestItem",
+            "--output", str(output_file)
+        ],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONUTF8": "1"}
+    )
+
+    assert result.returncode == 1
+    assert output_file.read_text() == "OLD=template\n"
+    assert not list(temp_work_dir.glob("*.tmp"))
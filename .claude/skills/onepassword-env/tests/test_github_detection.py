@@ -1,29 +1,23 @@
 """Testy pro GitHub remote detection a naming convention."""
 
+import os
 import pytest
+import subprocess
 from pathlib import Path
-import sys
-
-# Přidáme scripts do path
-scripts_dir = Path(__file__).parent.parent / "scripts"
-sys.path.insert(0, str(scripts_dir))
 
+# scripts/ je v sys.path díky conftest.py
+import git_utils
 from git_utils import (
     find_git_root,
     get_git_remote,
     parse_github_url,
     relative_path_to_pattern,
     get_1password_names,
+    get_1password_names_batch,
     GitRemoteError
 )
 
 
-@pytest.fixture
-def git_test_cases_dir():
-    """Vrátí cestu k git test cases."""
-    return Path("/private/tmp/claude-501/-Users-chocho/737bd6b7-084b-4352-bc37-0fe1b6b26ba2/scratchpad/onepassword-env-tests/git-test-cases")
-
-
 class TestGitRootFinding:
     """Testy pro find_git_root()."""
 
@@ -53,6 +47,16 @@ class TestGitRootFinding:
         assert git_root.name == "frontend"  # Najde frontend/.git, ne parent!
         assert (git_root / ".git").exists()
 
+    def test_gitfile_stops_walk_at_submodule(self, tmp_path):
+        """.git jako soubor (submodule gitfile) je git root, walk nepokračuje k parentu."""
+        (tmp_path / ".git").mkdir()
+        nested = tmp_path / "frontend" / "src"
+        nested.mkdir(parents=True)
+        (tmp_path / "frontend" / ".git").write_text("gitdir: ../.git/modules/frontend\n")
+
+        git_root = find_git_root(nested / ".env")
+        assert git_root == Path(os.path.realpath(tmp_path / "frontend"))
+
     def test_no_git_returns_none(self, tmp_path):
         """Adresář bez .git vrátí None."""
         env_file = tmp_path / ".env"
@@ -61,6 +65,102 @@ class TestGitRootFinding:
         git_root = find_git_root(env_file)
         assert git_root is None
 
+    def test_cache_clear_sees_new_repo(self, tmp_path):
+        """Výsledek je cachovaný; cache_clear() umožní vidět nově vytvořený .git."""
+        start = tmp_path / "app"
+        start.mkdir()
+        # tmp_path leží mimo jakýkoli repozitář, takže první dotaz vrací None
+        assert find_git_root(start) is None
+
+        (tmp_path / ".git").mkdir()
+        assert find_git_root(start) is None  # stále z cache
+
+        find_git_root.cache_clear()
+        assert find_git_root(start) == Path(os.path.realpath(tmp_path))
+
+
+class TestGitRemote:
+    """Testy pro get_git_remote()."""
+
+    def test_remote_is_cached_per_repo(self, tmp_path, monkeypatch):
+        """Druhý dotaz na stejný repozitář už .git/config nečte."""
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+        subprocess.run(
+            ["git", "-C", str(tmp_path), "remote", "add", "origin",
+             "https://github.com/testuser/cached.git"],
+            check=True
+        )
+        monkeypatch.setattr(git_utils, "_CACHE_ENABLED", True)
+
+        calls = []
+        real_read = git_utils._read_config_remote
+
+        def counting_read(*args, **kwargs):
+            calls.append(args)
+            return real_read(*args, **kwargs)
+
+        monkeypatch.setattr(git_utils, "_read_config_remote", counting_read)
+
+        assert get_git_remote(tmp_path) == "https://github.com/testuser/cached.git"
+        assert get_git_remote(tmp_path / ".") == "https://github.com/testuser/cached.git"
+        assert len(calls) == 1
+
+    def test_cache_can_be_disabled(self, tmp_path, monkeypatch):
+        """S GIT_UTILS_CACHE=0 se změna remote projeví hned."""
+        (tmp_path / ".git").mkdir()
+        config = tmp_path / ".git" / "config"
+        config.write_text('[remote "origin"]\n\turl = https://github.com/testuser/old.git\n')
+        monkeypatch.setattr(git_utils, "_CACHE_ENABLED", False)
+
+        assert get_git_remote(tmp_path) == "https://github.com/testuser/old.git"
+        config.write_text('[remote "origin"]\n\turl = https://github.com/testuser/new.git\n')
+        assert get_git_remote(tmp_path) == "https://github.com/testuser/new.git"
+
+    def test_reads_git_dir_config_without_git(self, tmp_path, monkeypatch):
+        """.git/config se čte přímo, bez spouštění git procesu."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "config").write_text(
+            '[core]\n\tbare = false\n'
+            '[remote "origin"]\n'
+            '\turl = git@github.com:testuser/direct.git\n'
+            '\tfetch = +refs/heads/*:refs/remotes/origin/*\n'
+        )
+
+        def no_subprocess(*args, **kwargs):
+            raise AssertionError("git should not be spawned")
+
+        monkeypatch.setattr(git_utils.subprocess, "run", no_subprocess)
+
+        assert get_git_remote(tmp_path) == "git@github.com:testuser/direct.git"
+        assert get_git_remote(tmp_path, "upstream") is None
+
+    def test_reads_submodule_gitfile(self, tmp_path):
+        """Submodule: .git je soubor s 'gitdir:' odkazem do parent/.git/modules."""
+        module_dir = tmp_path / ".git" / "modules" / "frontend"
+        module_dir.mkdir(parents=True)
+        (module_dir / "config").write_text(
+            '[remote "origin"]\n\turl = https://github.com/testuser/frontend-lib.git\n'
+        )
+        submodule = tmp_path / "frontend"
+        submodule.mkdir()
+        (submodule / ".git").write_text("gitdir: ../.git/modules/frontend\n")
+
+        assert get_git_remote(submodule) == "https://github.com/testuser/frontend-lib.git"
+
+    def test_reads_worktree_commondir(self, tmp_path):
+        """Worktree: gitdir obsahuje commondir odkazující na hlavní .git."""
+        main_git = tmp_path / "main" / ".git"
+        (main_git / "worktrees" / "wt").mkdir(parents=True)
+        (main_git / "config").write_text(
+            '[remote "origin"]\n\turl = https://github.com/testuser/main.git\n'
+        )
+        (main_git / "worktrees" / "wt" / "commondir").write_text("../..\n")
+        worktree = tmp_path / "wt"
+        worktree.mkdir()
+        (worktree / ".git").write_text(f"gitdir: {main_git / 'worktrees' / 'wt'}\n")
+
+        assert get_git_remote(worktree) == "https://github.com/testuser/main.git"
+
 
 class TestGitHubURLParsing:
     """Testy pro parse_github_url()."""
@@ -89,6 +189,12 @@ class TestGitHubURLParsing:
         assert user == "testuser"
         assert repo == "myproject"
 
+    def test_https_with_trailing_slash(self):
+        """HTTPS URL s koncovým lomítkem."""
+        user, repo = parse_github_url("https://github.com/testuser/myproject/")
+        assert user == "testuser"
+        assert repo == "myproject"
+
     def test_invalid_url_raises_error(self):
         """Nevalidní URL vyhodí chybu."""
         with pytest.raises(GitRemoteError):
@@ -135,6 +241,14 @@ class TestRelativePathPattern:
         pattern = relative_path_to_pattern(env_path, git_root)
         assert pattern == "backend__env.local"
 
+    def test_only_first_env_is_replaced(self, tmp_path):
+        """/backend/.env.env → 'backend__env.env' (ne 'envenv')"""
+        git_root = tmp_path
+        env_path = git_root / "backend" / ".env.env"
+
+        pattern = relative_path_to_pattern(env_path, git_root)
+        assert pattern == "backend__env.env"
+
     def test_collision_cases(self, tmp_path):
         """Ověř že různé cesty mají různé patterns."""
         git_root = tmp_path
@@ -240,3 +354,50 @@ class TestGet1PasswordNames:
         error_msg = str(exc_info.value)
         assert "No git repository" in error_msg
         assert "not supported" in error_msg
+
+
+class TestGet1PasswordNamesBatch:
+    """Testy pro get_1password_names_batch()."""
+
+    def test_batch_keeps_input_order(self, tmp_path):
+        """Více .env ve stejném repu - výsledky ve vstupním pořadí."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "config").write_text(
+            '[remote "origin"]\n\turl = https://github.com/testorg/monorepo.git\n'
+        )
+        (tmp_path / "apps" / "web").mkdir(parents=True)
+        paths = [
+            tmp_path / "apps" / "web" / ".env",
+            tmp_path / ".env",
+            tmp_path / "apps" / "web" / ".env.local",
+        ]
+
+        names = get_1password_names_batch(paths)
+
+        assert names == [
+            ("gh-projects", "testorg__monorepo__apps__web__env"),
+            ("gh-projects", "testorg__monorepo__root"),
+            ("gh-projects", "testorg__monorepo__apps__web__env.local"),
+        ]
+        assert names == [get_1password_names(p) for p in paths]
+
+    def test_symlinked_path_uses_real_git_root(self, tmp_path):
+        """Cesta přes symlink (např. /tmp → /private/tmp na macOS) dá stejný pattern."""
+        repo = tmp_path / "real-repo"
+        (repo / "apps" / "web").mkdir(parents=True)
+        (repo / ".git").mkdir()
+        (repo / ".git" / "config").write_text(
+            '[remote "origin"]\n\turl = https://github.com/testuser/linked.git\n'
+        )
+        (tmp_path / "link").symlink_to(repo, target_is_directory=True)
+
+        names = get_1password_names_batch([tmp_path / "link" / "apps" / "web" / ".env"])
+        assert names == [("gh-projects", "testuser__linked__apps__web__env")]
+        assert get_1password_names(tmp_path / "link" / ".env") == (
+            "gh-projects", "testuser__linked__root"
+        )
+
+    def test_batch_no_git_raises_error(self, tmp_path):
+        """Soubor mimo git repo vyhodí stejnou chybu jako get_1password_names()."""
+        with pytest.raises(GitRemoteError, match="No git repository"):
+            get_1password_names_batch([tmp_path / ".env"])
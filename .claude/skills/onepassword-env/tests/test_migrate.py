@@ -1,34 +1,28 @@
 """Integrace testy pro migrate_env_to_1password.py."""
 
+import pytest
 import subprocess
 from pathlib import Path
-import shutil
 
 
-def test_migrate_creates_backup(test_cases_dir, temp_work_dir, scripts_dir):
+def test_migrate_creates_backup(test_cases_dir, temp_work_dir, stage_env, migrate, capsys):
     """Test, že migrace vytvoří .env.backup."""
-    # Zkopíruj testovací soubor do temp adresáře
+    # Připrav testovací soubor do temp adresáře (hard link)
     src_env = test_cases_dir / "case1-simple" / ".env"
-    dest_env = temp_work_dir / ".env"
-    shutil.copy(src_env, dest_env)
+    dest_env = stage_env(src_env, temp_work_dir)
 
     # Spusť migraci s --backup a --dry-run (nevolá skutečný op CLI)
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(dest_env), "TestVault", "TestItem",
-            "--backup", "--dry-run"
-        ],
-        capture_output=True,
-        text=True,
-        cwd=temp_work_dir
-    )
+    exit_code = migrate.main([
+        str(dest_env), "TestVault", "TestItem",
+        "--backup", "--dry-run"
+    ])
+    captured = capsys.readouterr()
 
     # V dry-run mode by měl vytvořit .env.backup a .env.tpl
     backup_file = temp_work_dir / ".env.backup"
     template_file = temp_work_dir / ".env.tpl"
 
-    assert result.returncode == 0, f"Migration failed: {result.stderr}"
+    assert exit_code == 0, f"Migration failed: {captured.err}"
     assert backup_file.exists(), ".env.backup should be created"
     assert template_file.exists(), ".env.tpl should be created"
 
@@ -36,28 +30,23 @@ def test_migrate_creates_backup(test_cases_dir, temp_work_dir, scripts_dir):
     assert backup_file.read_text() == dest_env.read_text()
 
 
-def test_migrate_updates_gitignore(test_cases_dir, temp_work_dir, scripts_dir):
+def test_migrate_updates_gitignore(test_cases_dir, temp_work_dir, stage_env, migrate, capsys):
     """Test, že migrace aktualizuje .gitignore."""
     src_env = test_cases_dir / "case1-simple" / ".env"
-    dest_env = temp_work_dir / ".env"
-    shutil.copy(src_env, dest_env)
+    dest_env = stage_env(src_env, temp_work_dir)
 
     # Vytvoř prázdný .gitignore
     gitignore = temp_work_dir / ".gitignore"
     gitignore.write_text("# Initial content\n")
 
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(dest_env), "TestVault", "TestItem",
-            "--dry-run"
-        ],
-        capture_output=True,
-        text=True,
-        cwd=temp_work_dir
-    )
+    exit_code = migrate.main([
+        str(dest_env), "TestVault", "TestItem",
+        "--dry-run"
+    ])
+    captured = capsys.readouterr()
 
-    assert result.returncode == 0
+    assert exit_code == 0, f"Migration failed: {captured.out}"
+    assert f"Updated {gitignore}" in captured.out
 
     gitignore_content = gitignore.read_text()
     assert ".env" in gitignore_content
@@ -65,79 +54,64 @@ def test_migrate_updates_gitignore(test_cases_dir, temp_work_dir, scripts_dir):
     assert "!.env.tpl" in gitignore_content
 
 
-def test_migrate_creates_template_with_secrets(test_cases_dir, temp_work_dir, scripts_dir):
+def test_migrate_gitignore_substring_is_not_enough(temp_work_dir, migrate, capsys):
+    """Test že zmínka .env jen v komentáři nebo jiném vzoru nestačí."""
+    (temp_work_dir / ".env").write_text("API_KEY=abc\n")
+    gitignore = temp_work_dir / ".gitignore"
+    gitignore.write_text("# see .env docs\nnode_modules/.env.sample\n")
+
+    exit_code = migrate.main([
+        str(temp_work_dir / ".env"), "TestVault", "TestItem",
+        "--dry-run"
+    ])
+    captured = capsys.readouterr()
+
+    assert exit_code == 0, f"Migration failed: {captured.out}"
+    assert "already contains .env entries" not in captured.out
+    lines = gitignore.read_text().splitlines()
+    assert lines[:2] == ["# see .env docs", "node_modules/.env.sample"]
+    assert ".env" in lines
+    assert ".env.backup" in lines
+
+
+def test_migrate_creates_template_with_secrets(test_cases_dir, migrated_outputs):
     """Test že migrace vytvoří template s op:// odkazy pro secrets."""
-    src_env = test_cases_dir / "case1-simple" / ".env"
-    dest_env = temp_work_dir / ".env"
-    shutil.copy(src_env, dest_env)
-
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(dest_env), "TestVault", "TestItem",
-            "--dry-run"
-        ],
-        capture_output=True,
-        text=True,
-        cwd=temp_work_dir
+    exit_code, content, _, _ = migrated_outputs(
+        test_cases_dir / "case1-simple" / ".env", "TestVault", "TestItem"
     )
 
-    assert result.returncode == 0
+    assert exit_code == 0
+    assert content is not None
 
-    template_file = temp_work_dir / ".env.tpl"
-    assert template_file.exists()
-
-    content = template_file.read_text()
     assert 'op://TestVault/TestItem/db_password' in content
     assert 'op://TestVault/TestItem/api_key' in content
 
 
-def test_migrate_without_backup(test_cases_dir, temp_work_dir, scripts_dir):
+def test_migrate_without_backup(test_cases_dir, temp_work_dir, stage_env, migrate, capsys):
     """Test že bez --backup flagu se .env.backup nevytváří."""
     src_env = test_cases_dir / "case1-simple" / ".env"
-    dest_env = temp_work_dir / ".env"
-    shutil.copy(src_env, dest_env)
-
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(dest_env), "TestVault", "TestItem",
-            "--dry-run"  # Bez --backup
-        ],
-        capture_output=True,
-        text=True,
-        cwd=temp_work_dir
-    )
+    dest_env = stage_env(src_env, temp_work_dir)
 
-    assert result.returncode == 0
+    exit_code = migrate.main([
+        str(dest_env), "TestVault", "TestItem",
+        "--dry-run"  # Bez --backup
+    ])
+    captured = capsys.readouterr()
 
-    backup_file = temp_work_dir / ".env.backup"
-    # Backup by se neměl vytvořit bez --backup flagu
-    # POZNÁMKA: Podle implementace možná se stejně vytvoří v dry-run
-    # To je OK, hlavně aby to nefailovalo
+    assert exit_code == 0, f"Migration failed: {captured.out}"
 
+    # Bez --backup flagu se backup nevytváří (ani v dry-run)
+    assert "Backed up" not in captured.out
+    assert not (temp_work_dir / ".env.backup").exists()
 
-def test_migrate_mixed_env(test_cases_dir, temp_work_dir, scripts_dir):
+
+def test_migrate_mixed_env(test_cases_dir, migrated_outputs):
     """Test migrace .env s mixem secrets a non-secrets."""
-    src_env = test_cases_dir / "case4-mixed" / ".env"
-    dest_env = temp_work_dir / ".env"
-    shutil.copy(src_env, dest_env)
-
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(dest_env), "TestVault", "TestItem",
-            "--dry-run"
-        ],
-        capture_output=True,
-        text=True,
-        cwd=temp_work_dir
+    exit_code, content, _, _ = migrated_outputs(
+        test_cases_dir / "case4-mixed" / ".env", "TestVault", "TestItem"
     )
 
-    assert result.returncode == 0
-
-    template_file = temp_work_dir / ".env.tpl"
-    content = template_file.read_text()
+    assert exit_code == 0
 
     # Secrets by měly mít op:// odkazy
     assert 'op://TestVault/TestItem/db_password' in content
@@ -151,27 +125,13 @@ def test_migrate_mixed_env(test_cases_dir, temp_work_dir, scripts_dir):
     assert '# Database' in content
 
 
-def test_migrate_preserves_comments(test_cases_dir, temp_work_dir, scripts_dir):
+def test_migrate_preserves_comments(test_cases_dir, migrated_outputs):
     """Test že migrace zachovává komentáře."""
-    src_env = test_cases_dir / "case5-comments" / ".env"
-    dest_env = temp_work_dir / ".env"
-    shutil.copy(src_env, dest_env)
-
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(dest_env), "TestVault", "TestItem",
-            "--dry-run"
-        ],
-        capture_output=True,
-        text=True,
-        cwd=temp_work_dir
+    exit_code, content, _, _ = migrated_outputs(
+        test_cases_dir / "case5-comments" / ".env", "TestVault", "TestItem"
     )
 
-    assert result.returncode == 0
-
-    template_file = temp_work_dir / ".env.tpl"
-    content = template_file.read_text()
+    assert exit_code == 0
 
     # Ověř komentáře
     assert "# Database Configuration" in content
@@ -179,44 +139,67 @@ def test_migrate_preserves_comments(test_cases_dir, temp_work_dir, scripts_dir):
     assert "# Final comment" in content
 
 
-def test_migrate_nonexistent_file(temp_work_dir, scripts_dir):
+def test_migrate_nonexistent_file(temp_work_dir, migrate, capsys):
     """Test že migrace failuje s nonexistent file."""
     nonexistent = temp_work_dir / "does_not_exist.env"
 
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(nonexistent), "TestVault", "TestItem"
-        ],
-        capture_output=True,
-        text=True
-    )
+    exit_code = migrate.main([
+        str(nonexistent), "TestVault", "TestItem"
+    ])
+    captured = capsys.readouterr()
 
     # Měl by failnout s exit code 1
-    assert result.returncode == 1
-    assert "not found" in result.stdout.lower() or "not found" in result.stderr.lower()
+    assert exit_code == 1
+    assert "not found" in captured.out.lower() or "not found" in captured.err.lower()
+
+
+def test_migrate_template_exact_output(temp_work_dir, run_migrate):
+    """Test že šablona z jednoho průchodu zachová nesekretní řádky beze změny.
+
+    CLI smoke test - jediný test, který spouští skript skutečně přes subprocess.
+    """
+    dest_env = temp_work_dir / ".env"
+    dest_env.write_text(
+        "# Config\n"
+        "API_KEY=abc\n"
+        "DEBUG=true\n"
+        "\n"
+        "DB_PASSWORD=\"x y\"\n"
+        "not a variable\n"
+    )
+
+    result = run_migrate(
+        [str(dest_env), "TestVault", "TestItem", "--dry-run"],
+        cwd=temp_work_dir
+    )
+
+    assert result.returncode == 0, f"Migration failed: {result.stderr}"
+    assert (temp_work_dir / ".env.tpl").read_text() == (
+        "# Config\n"
+        "API_KEY=\"op://TestVault/TestItem/api_key\"\n"
+        "DEBUG=true\n"
+        "\n"
+        "DB_PASSWORD=\"op://TestVault/TestItem/db_password\"\n"
+        "not a variable\n"
+    )
 
 
 # Tests for --auto mode (GitHub-based naming)
 
-def test_migrate_auto_simple_project(git_test_cases_dir, scripts_dir):
+def test_migrate_auto_simple_project(git_test_cases_dir, migrate, capsys):
     """Test --auto režim na jednoduchém projektu."""
     env_file = git_test_cases_dir / "simple-project" / "cli" / ".env"
 
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(env_file), "--auto", "--dry-run"
-        ],
-        capture_output=True,
-        text=True
-    )
+    exit_code = migrate.main([
+        str(env_file), "--auto", "--dry-run"
+    ])
+    captured = capsys.readouterr()
 
-    assert result.returncode == 0, f"Migration failed: {result.stderr}"
+    assert exit_code == 0, f"Migration failed: {captured.err}"
 
     # Ověř, že auto-detekoval správné jméno
-    assert "testuser__simple-app__cli__env" in result.stdout
-    assert "gh-projects" in result.stdout
+    assert "testuser__simple-app__cli__env" in captured.out
+    assert "gh-projects" in captured.out
 
     # Ověř, že .env.tpl byl vytvořen
     template_file = git_test_cases_dir / "simple-project" / "cli" / ".env.tpl"
@@ -227,122 +210,215 @@ def test_migrate_auto_simple_project(git_test_cases_dir, scripts_dir):
     assert "op://gh-projects/testuser__simple-app__cli__env/" in content
 
 
-def test_migrate_auto_submodule_frontend(git_test_cases_dir, scripts_dir):
+def test_migrate_auto_submodule_frontend(git_test_cases_dir, migrate, capsys):
     """Test --auto na submodule - měl by použít submodule remote, ne parent."""
     env_file = git_test_cases_dir / "submodule-project" / "frontend" / ".env"
 
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(env_file), "--auto", "--dry-run"
-        ],
-        capture_output=True,
-        text=True
-    )
+    exit_code = migrate.main([
+        str(env_file), "--auto", "--dry-run"
+    ])
+    captured = capsys.readouterr()
 
-    assert result.returncode == 0
+    assert exit_code == 0
 
     # Měl by detekovat frontend submodule remote (NE parent main-app)
-    assert "testuser__frontend-lib__root" in result.stdout
-    assert "gh-projects" in result.stdout
+    assert "testuser__frontend-lib__root" in captured.out
+    assert "gh-projects" in captured.out
 
     template_file = git_test_cases_dir / "submodule-project" / "frontend" / ".env.tpl"
     content = template_file.read_text()
     assert "op://gh-projects/testuser__frontend-lib__root/" in content
 
 
-def test_migrate_auto_monorepo_nested(git_test_cases_dir, scripts_dir):
+def test_migrate_auto_monorepo_nested(git_test_cases_dir, migrate, capsys):
     """Test --auto na monorepo vnořeném .env."""
     env_file = git_test_cases_dir / "monorepo-project" / "apps" / "web" / ".env"
 
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(env_file), "--auto", "--dry-run"
-        ],
-        capture_output=True,
-        text=True
-    )
+    exit_code = migrate.main([
+        str(env_file), "--auto", "--dry-run"
+    ])
+    captured = capsys.readouterr()
 
-    assert result.returncode == 0
+    assert exit_code == 0
 
     # Měl by zachovat path pattern
-    assert "testorg__monorepo__apps__web__env" in result.stdout
-    assert "gh-projects" in result.stdout
+    assert "testorg__monorepo__apps__web__env" in captured.out
+    assert "gh-projects" in captured.out
 
     template_file = git_test_cases_dir / "monorepo-project" / "apps" / "web" / ".env.tpl"
     content = template_file.read_text()
     assert "op://gh-projects/testorg__monorepo__apps__web__env/" in content
 
 
-def test_migrate_auto_no_remote_fails(git_test_cases_dir, scripts_dir):
+def test_migrate_auto_no_remote_fails(git_test_cases_dir, migrate, capsys):
     """Test --auto failuje jasně pro projekt bez remote."""
     env_file = git_test_cases_dir / "no-remote-project" / ".env"
 
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(env_file), "--auto", "--dry-run"
-        ],
-        capture_output=True,
-        text=True
-    )
+    exit_code = migrate.main([
+        str(env_file), "--auto", "--dry-run"
+    ])
+    captured = capsys.readouterr()
 
     # Měl by failnout
-    assert result.returncode == 1
+    assert exit_code == 1
 
     # Měl by vypsat jasnou chybu a návod
-    output = result.stdout + result.stderr
+    output = captured.out + captured.err
     assert "No git remote" in output or "not supported" in output
     assert "git remote" in output  # Návod jak opravit
 
 
-def test_migrate_manual_mode_still_works(test_cases_dir, temp_work_dir, scripts_dir):
+def test_migrate_manual_mode_still_works(test_cases_dir, temp_work_dir, stage_env, migrate, capsys):
     """Test že manuální mode (bez --auto) stále funguje."""
     src_env = test_cases_dir / "case1-simple" / ".env"
-    dest_env = temp_work_dir / ".env"
-    shutil.copy(src_env, dest_env)
-
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(dest_env), "CustomVault", "CustomItem", "--dry-run"
-        ],
-        capture_output=True,
-        text=True,
-        cwd=temp_work_dir
-    )
+    dest_env = stage_env(src_env, temp_work_dir)
 
-    assert result.returncode == 0
+    exit_code = migrate.main([
+        str(dest_env), "CustomVault", "CustomItem", "--dry-run"
+    ])
+    captured = capsys.readouterr()
+
+    assert exit_code == 0
 
     # Měl by použít custom názvy
-    assert "CustomVault" in result.stdout
-    assert "CustomItem" in result.stdout
+    assert "CustomVault" in captured.out
+    assert "CustomItem" in captured.out
 
     template_file = temp_work_dir / ".env.tpl"
     content = template_file.read_text()
     assert "op://CustomVault/CustomItem/" in content
 
 
-def test_migrate_auto_without_arguments_fails(test_cases_dir, temp_work_dir, scripts_dir):
+def test_migrate_named_env_gets_own_template(temp_work_dir, migrate, capsys):
+    """Test že .env.local dostane šablonu .env.local.tpl, ne sdílenou .env.tpl."""
+    env_file = temp_work_dir / ".env.local"
+    env_file.write_text("API_KEY=abc\nDEBUG=true\n")
+
+    exit_code = migrate.main([str(env_file), "CustomVault", "CustomItem", "--dry-run"])
+    captured = capsys.readouterr()
+
+    assert exit_code == 0, f"Migration failed: {captured.out}"
+    assert "Generating .env.local.tpl template" in captured.out
+    assert not (temp_work_dir / ".env.tpl").exists()
+    template = (temp_work_dir / ".env.local.tpl").read_text()
+    assert template == 'API_KEY="op://CustomVault/CustomItem/api_key"\nDEBUG=true\n'
+
+
+def test_migrate_auto_without_arguments_fails(test_cases_dir, temp_work_dir, stage_env, migrate, capsys):
     """Test že --auto režim nevyžaduje vault/item argumenty."""
     src_env = test_cases_dir / "case1-simple" / ".env"
-    dest_env = temp_work_dir / ".env"
-    shutil.copy(src_env, dest_env)
+    dest_env = stage_env(src_env, temp_work_dir)
 
     # Tohle by mělo failnout, protože --auto vyžaduje git remote
     # (temp_work_dir není git repo)
-    result = subprocess.run(
-        [
-            "python3", str(scripts_dir / "migrate_env_to_1password.py"),
-            str(dest_env), "--auto", "--dry-run"
-        ],
-        capture_output=True,
-        text=True,
-        cwd=temp_work_dir
-    )
+    exit_code = migrate.main([
+        str(dest_env), "--auto", "--dry-run"
+    ])
+    captured = capsys.readouterr()
 
     # Měl by failnout kvůli chybějícímu git remote
-    assert result.returncode == 1
-    output = result.stdout + result.stderr
+    assert exit_code == 1
+    output = captured.out + captured.err
     assert "No git repository" in output or "not supported" in output
+
+
+def test_migrate_multiple_files_parallel(temp_work_dir, migrate, capsys):
+    """Test že --files migruje více .env souborů najednou (auto mode)."""
+    subprocess.run(["git", "init", "-q", str(temp_work_dir)], check=True)
+    subprocess.run(
+        ["git", "-C", str(temp_work_dir), "remote", "add", "origin",
+         "git@github.com:testuser/multi.git"],
+        check=True
+    )
+    env_files = []
+    for name in ("api", "web"):
+        app_dir = temp_work_dir / "apps" / name
+        app_dir.mkdir(parents=True)
+        (app_dir / ".env").write_text("API_KEY=abc\nDEBUG=true\n")
+        env_files.append(str(app_dir / ".env"))
+
+    exit_code = migrate.main([
+        "--files", *env_files,
+        "--dry-run"
+    ])
+    captured = capsys.readouterr()
+
+    assert exit_code == 0, f"Migration failed: {captured.out}"
+    assert "Migrated 2/2 file(s)" in captured.out
+    # Výstupy jednotlivých souborů se nepromíchají - jdou v pořadí vstupu
+    assert captured.out.index("apps/api/.env") < captured.out.index("apps/web/.env")
+    for name in ("api", "web"):
+        template = (temp_work_dir / "apps" / name / ".env.tpl").read_text()
+        assert f'API_KEY="op://gh-projects/testuser__multi__apps__{name}__env/api_key"' in template
+
+
+def test_migrate_multiple_files_same_directory(temp_work_dir, migrate, capsys):
+    """Test že více .env ve stejném adresáři přidá .gitignore blok jen jednou."""
+    subprocess.run(["git", "init", "-q", str(temp_work_dir)], check=True)
+    subprocess.run(
+        ["git", "-C", str(temp_work_dir), "remote", "add", "origin",
+         "https://github.com/testuser/samedir.git"],
+        check=True
+    )
+    (temp_work_dir / ".env").write_text("API_KEY=abc\n")
+    (temp_work_dir / ".env.production").write_text("DB_PASSWORD=xyz\n")
+
+    exit_code = migrate.main([
+        "--files", str(temp_work_dir / ".env"), str(temp_work_dir / ".env.production"),
+        "--dry-run"
+    ])
+    captured = capsys.readouterr()
+
+    assert exit_code == 0, f"Migration failed: {captured.out}"
+    lines = (temp_work_dir / ".gitignore").read_text().splitlines()
+    assert lines.count(".env") == 1
+    # Každý soubor má vlastní šablonu - druhý nesmí přepsat první
+    assert "API_KEY=" in (temp_work_dir / ".env.tpl").read_text()
+    assert "DB_PASSWORD" not in (temp_work_dir / ".env.tpl").read_text()
+    assert "DB_PASSWORD=" in (temp_work_dir / ".env.production.tpl").read_text()
+    assert not list(temp_work_dir.glob("*.tmp"))
+
+
+def test_migrate_files_excludes_positional_env(temp_work_dir, migrate, capsys):
+    """Test že poziční env_file a --files nejdou kombinovat (dřív se env_file tiše ignoroval)."""
+    (temp_work_dir / ".env").write_text("API_KEY=abc\n")
+
+    with pytest.raises(SystemExit) as exc:
+        migrate.main([str(temp_work_dir / ".env"), "--files", str(temp_work_dir / ".env")])
+
+    assert exc.value.code == 2
+    assert "not allowed with argument" in capsys.readouterr().err
+
+
+def test_vault_items_listed_once_without_holding_lock(migrate, monkeypatch):
+    """Test že souběžné dotazy na stejný vault spustí op item list jen jednou."""
+    import threading
+
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def fake_list(vault):
+        calls.append(vault)
+        if vault == "slow":
+            started.set()
+            release.wait(5)
+        return {f"{vault}-item"}
+
+    monkeypatch.setattr(migrate, "_VAULT_ITEMS_CACHE", {})
+    monkeypatch.setattr(migrate, "_list_vault_items", fake_list)
+
+    results = []
+    workers = [threading.Thread(target=lambda: results.append(migrate._vault_items("slow")))
+               for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    assert started.wait(5)
+    # Jiný vault nečeká na pomalý listing
+    assert migrate._vault_items("fast") == {"fast-item"}
+    release.set()
+    for worker in workers:
+        worker.join(5)
+
+    assert results == [{"slow-item"}] * 3
+    assert calls.count("slow") == 1
@@ -9,6 +9,8 @@ import os
 import sys
 from pathlib import Path
 
+_HERE = Path(__file__).resolve().parent
+
 # Umožní spuštění i uvnitř Claude Code session
 os.environ.pop("CLAUDECODE", None)
 
@@ -26,10 +28,12 @@ except ImportError:
     print("Spusť: .venv/bin/pip install claude-agent-sdk")
     sys.exit(1)
 
+from coder_prompt import PROJECTS, prompt_header
+
 try:
     from dotenv import load_dotenv
 
-    load_dotenv(Path(__file__).parent / ".env")
+    load_dotenv(_HERE / ".env")
 except ImportError:
     pass  # python-dotenv je volitelný
 
@@ -54,35 +58,7 @@ if not CODER_SESSION_TOKEN:
     sys.exit(1)
 
 # ── System Prompt ──────────────────────────────────────────────────────────────
-SYSTEM_PROMPT = f"""Jsi Coder workspace management assistant s přístupem na Coder instanci přes MCP.
-
-## Setup
-- URL: {CODER_URL}
-- Server: Hetzner VPS, Docker Compose (Coder + PostgreSQL + Caddy)
-- Template: dev-workspace — Docker kontejnery s Claude Code, Git, Node.js, Python 3.13
-
-## Dostupné projekty (projekt → GitHub repo)
-dotfiles→chocholous/dotfiles, agentickeboola_web→pavel242242/agentic-bridge-core,
-applicator→chocholous/applicator, bg→pavel242242/bg, compare→chocholous/budget-builder,
-dataapps→padak/e2b-dataapps-demo, datagen→pavel242242/datagen,
-datatalk-events→chocholous/datatalk-events, db-mcp→pavel242242/sql-databases-mcp,
-driver-builder→padak/driver_builder, driver_builder→padak/driver_builder,
-driver_builder_ui→padak/driver_builder, e2b-tereza→padak/e2b-tereza,
-get-started→pavel242242/osiris-get-started, get-started-x→pavel242242/osiris-get-started,
-linear→padak/pizza-team, mcp-cli→chocholous/mcp-cli, mi-ui2→keboola/sales-asisstant-agent-ui,
-mysql→pavel242242/mysql, mysql-p→keboola/setup-cdc-python,
-ng_component→pavel242242/ng_component, ng_component_k2→pavel242242/ng_component,
-osir→keboola/osiris, padak-e2b→keboola/e2b_demo,
-portland-extension→pavel242242/portland-extension, pricing→keboola/pricing-agent,
-rohlik_bot→padak/rohlik_bot, salescrew→pavel242242/salescrew,
-setup-experiment→chocholous/budget-builder, small-data-sf-2025→dlt-hub/small-data-sf-2025,
-STAGEHAND→pavel242242/bohemian-hackathon, surf→e2b-dev/surf,
-testing-applicator→chocholous/applicator, testing-applicator-backup→chocholous/applicator,
-thevibecoder_lovable→pavel242242/thevibecoders, thevibecoders-revamped→chocholous/thevibecoders-revamped,
-ultra-apify→chocholous/apify-browser, vibecoders-react→chocholous/vibecoders-react,
-vibe-coding→pavel242242/fans
-
-## Co umíš
+SYSTEM_PROMPT = prompt_header(CODER_URL, PROJECTS) + """## Co umíš
 - Listovat, vytvářet, startovat, stopovat, mazat workspace
 - Spouštět bash příkazy ve workspacích (coder_workspace_bash)
 - Číst/zapisovat/editovat soubory ve workspacích
@@ -103,16 +79,49 @@ vibe-coding→pavel242242/fans
 """
 
 
+# Tool call formátování: prefix "⚙ <short>" se počítá jednou pro každý tool
+_BASH_TOOL = "coder_workspace_bash"
+_TOOL_PREFIX_CACHE: dict[str, str] = {}
+
+
+def _tool_prefix(name: str) -> str:
+    prefix = _TOOL_PREFIX_CACHE.get(name)
+    if prefix is None:
+        prefix = _TOOL_PREFIX_CACHE[name] = DIM + "  ⚙ " + name.removeprefix("coder_")
+    return prefix
+
+
 def fmt_tool(name: str, inp: dict) -> str:
     """Formátování tool callu pro terminál."""
-    short = name.removeprefix("coder_")
+    prefix = _tool_prefix(name)
     ws = inp.get("workspace_name") or inp.get("name") or ""
-    if name == "coder_workspace_bash":
+    if name == _BASH_TOOL:
         cmd = inp.get("command", "")[:80]
-        return f"{DIM}  ⚙ {short} [{ws}] $ {cmd}{RESET}"
+        return "".join((prefix, " [", ws, "] $ ", cmd, RESET))
     if ws:
-        return f"{DIM}  ⚙ {short} {ws}{RESET}"
-    return f"{DIM}  ⚙ {short}{RESET}"
+        return "".join((prefix, " ", ws, RESET))
+    return prefix + RESET
+
+
+def _handle_text(block: TextBlock, in_text: bool) -> bool:
+    if not block.text:
+        return in_text
+    if not in_text:
+        print(f"{BOLD}Claude:{RESET} ", end="", flush=True)
+    print(block.text, end="", flush=True)
+    return True
+
+
+def _handle_tool(block: ToolUseBlock, in_text: bool) -> bool:
+    if in_text:
+        print()
+    print(fmt_tool(block.name, block.input), flush=True)
+    return False
+
+
+# Dispatch podle přesného typu bloku (konkrétní SDK třídy) místo isinstance řetězu;
+# handler vrací nový stav in_text
+_BLOCK_HANDLERS = {TextBlock: _handle_text, ToolUseBlock: _handle_tool}
 
 
 async def stream_response(client: ClaudeSDKClient) -> None:
@@ -124,16 +133,9 @@ async def stream_response(client: ClaudeSDKClient) -> None:
     async for msg in client.receive_response():
         if isinstance(msg, AssistantMessage):
             for block in msg.content:
-                if isinstance(block, TextBlock) and block.text:
-                    if not in_text:
-                        print(f"{BOLD}Claude:{RESET} ", end="", flush=True)
-                        in_text = True
-                    print(block.text, end="", flush=True)
-                elif isinstance(block, ToolUseBlock):
-                    if in_text:
-                        print()
-                        in_text = False
-                    print(fmt_tool(block.name, block.input), flush=True)
+                handler = _BLOCK_HANDLERS.get(type(block))
+                if handler is not None:
+                    in_text = handler(block, in_text)
 
         elif isinstance(msg, ResultMessage):
             turns = msg.num_turns
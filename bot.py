@@ -7,7 +7,9 @@ Prereq:   TELEGRAM_BOT_TOKEN v .env (získáš od @BotFather na Telegramu)
 
 import asyncio
 import os
+import sqlite3
 import sys
+import time
 from pathlib import Path
 
 os.environ.pop("CLAUDECODE", None)
@@ -19,10 +21,16 @@ try:
 except ImportError:
     pass
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # volitelné - bez něj běží výchozí asyncio loop
+
 from aiogram import Bot, Dispatcher, F
 from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.enums import ChatAction, ParseMode
+from aiogram.exceptions import TelegramBadRequest
 
 from claude_agent_sdk import ClaudeSDKClient, ClaudeAgentOptions
 from claude_agent_sdk.types import (
@@ -33,11 +41,16 @@ from claude_agent_sdk.types import (
     ToolUseBlock,
 )
 
+from coder_prompt import CHAT_PROJECTS, prompt_header
+
 # ── Config ─────────────────────────────────────────────────────────────────────
 TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
 CODER_URL = os.environ.get("CODER_URL", "https://46-225-180-131.nip.io")
 CODER_SESSION_TOKEN = os.environ.get("CODER_SESSION_TOKEN", "")
 CODER_BINARY = os.environ.get("CODER_BINARY", "/usr/local/bin/coder")
+SESSIONS_DB = os.environ.get(
+    "BOT_SESSIONS_DB", str(Path(__file__).parent / "bot_sessions.db")
+)
 
 if not TELEGRAM_BOT_TOKEN:
     print("CHYBA: TELEGRAM_BOT_TOKEN není nastaveno.")
@@ -50,32 +63,7 @@ if not CODER_SESSION_TOKEN:
     print("CHYBA: CODER_SESSION_TOKEN není nastaveno.")
     sys.exit(1)
 
-SYSTEM_PROMPT = f"""Jsi Coder workspace management assistant s přístupem na Coder instanci přes MCP.
-
-## Setup
-- URL: {CODER_URL}
-- Server: Hetzner VPS, Docker Compose (Coder + PostgreSQL + Caddy)
-- Template: dev-workspace — Docker kontejnery s Claude Code, Git, Node.js, Python 3.13
-
-## Dostupné projekty (projekt → GitHub repo)
-dotfiles→chocholous/dotfiles, agentickeboola_web→pavel242242/agentic-bridge-core,
-applicator→chocholous/applicator, bg→pavel242242/bg, compare→chocholous/budget-builder,
-dataapps→padak/e2b-dataapps-demo, datagen→pavel242242/datagen,
-datatalk-events→chocholous/datatalk-events, db-mcp→pavel242242/sql-databases-mcp,
-driver-builder→padak/driver_builder, e2b-tereza→padak/e2b-tereza,
-get-started→pavel242242/osiris-get-started, linear→padak/pizza-team,
-mcp-cli→chocholous/mcp-cli, mi-ui2→keboola/sales-asisstant-agent-ui,
-mysql→pavel242242/mysql, ng_component→pavel242242/ng_component,
-osir→keboola/osiris, padak-e2b→keboola/e2b_demo,
-portland-extension→pavel242242/portland-extension, pricing→keboola/pricing-agent,
-rohlik_bot→padak/rohlik_bot, salescrew→pavel242242/salescrew,
-STAGEHAND→pavel242242/bohemian-hackathon, surf→e2b-dev/surf,
-testing-applicator→chocholous/applicator, thevibecoder_lovable→pavel242242/thevibecoders,
-thevibecoders-revamped→chocholous/thevibecoders-revamped,
-ultra-apify→chocholous/apify-browser, vibecoders-react→chocholous/vibecoders-react,
-vibe-coding→pavel242242/fans
-
-## Co umíš
+SYSTEM_PROMPT = prompt_header(CODER_URL, CHAT_PROJECTS) + """## Co umíš
 - Listovat, vytvářet, startovat, stopovat, mazat workspace
 - Spouštět bash příkazy ve workspacích (coder_workspace_bash)
 - Číst/zapisovat/editovat soubory ve workspacích
@@ -86,31 +74,265 @@ Pokud odpověď bude delší, rozděl na více zpráv (max 4096 znaků každá).
 """
 
 # ── Session management ──────────────────────────────────────────────────────────
-# chat_id → session_id (pro obnovení konverzace bez udržování procesu)
-sessions: dict[int, str] = {}
+# Zápisy do DB se slučují: změny za _SESSIONS_FLUSH_DELAY s jdou jednou transakcí
+_SESSIONS_FLUSH_DELAY = 1.0
+
+
+class SessionStore:
+    """chat_id → session_id v paměti, perzistované do SQLite (write-behind).
+
+    Čtení jde jen z paměti; změny se značí jako dirty a zapíší se na pozadí,
+    takže restart bota konverzace neztratí a handler na disk nečeká.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data: dict[int, str] = {}
+        self._dirty: set[int] = set()
+        self._flush_task: asyncio.Task | None = None
+        self._db: sqlite3.Connection | None = None
+
+    def load(self) -> None:
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "chat_id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, updated_at INTEGER)"
+        )
+        rows = self._db.execute("SELECT chat_id, session_id FROM sessions")
+        self._data.update(rows)
+
+    def get(self, chat_id: int) -> str | None:
+        return self._data.get(chat_id)
+
+    def __setitem__(self, chat_id: int, session_id: str) -> None:
+        if self._data.get(chat_id) != session_id:
+            self._data[chat_id] = session_id
+            self._mark_dirty(chat_id)
+
+    def pop(self, chat_id: int, default: str | None = None) -> str | None:
+        if chat_id not in self._data:
+            return default
+        self._mark_dirty(chat_id)
+        return self._data.pop(chat_id)
+
+    def _mark_dirty(self, chat_id: int) -> None:
+        self._dirty.add(chat_id)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(_SESSIONS_FLUSH_DELAY)
+        self._flush_task = None
+        self.flush()
+
+    def flush(self) -> None:
+        if self._db is None or not self._dirty:
+            return
+        now = int(time.time())
+        dirty, self._dirty = self._dirty, set()
+        with self._db:
+            for chat_id in dirty:
+                session_id = self._data.get(chat_id)
+                if session_id is None:
+                    self._db.execute("DELETE FROM sessions WHERE chat_id = ?", (chat_id,))
+                else:
+                    self._db.execute(
+                        "INSERT INTO sessions (chat_id, session_id, updated_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(chat_id) DO UPDATE SET "
+                        "session_id = excluded.session_id, updated_at = excluded.updated_at",
+                        (chat_id, session_id, now),
+                    )
+
+    def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+# chat_id → session_id (pro obnovení konverzace po odpojení klienta i restartu)
+sessions = SessionStore(SESSIONS_DB)
+
+
+# Společné parametry klienta - sestavené jednou při startu, ne pro každou zprávu
+_BASE_OPTIONS_KW = {
+    "system_prompt": SYSTEM_PROMPT,
+    "max_turns": 25,
+    "mcp_servers": {
+        "coder": {
+            "command": CODER_BINARY,
+            "args": ["exp", "mcp", "server"],
+            "env": {
+                "CODER_URL": CODER_URL,
+                "CODER_SESSION_TOKEN": CODER_SESSION_TOKEN,
+                "HOME": os.environ.get("HOME", "/root"),
+                "PATH": "/usr/local/bin:/usr/bin:/bin:/usr/local/sbin",
+            },
+        }
+    },
+    "allowed_tools": ["mcp__coder__*"],
+    "permission_mode": "bypassPermissions",
+    "setting_sources": [],
+}
 
 
 def make_options(resume_id: str | None = None) -> ClaudeAgentOptions:
-    return ClaudeAgentOptions(
-        system_prompt=SYSTEM_PROMPT,
-        max_turns=25,
-        mcp_servers={
-            "coder": {
-                "command": CODER_BINARY,
-                "args": ["exp", "mcp", "server"],
-                "env": {
-                    "CODER_URL": CODER_URL,
-                    "CODER_SESSION_TOKEN": CODER_SESSION_TOKEN,
-                    "HOME": os.environ.get("HOME", "/root"),
-                    "PATH": "/usr/local/bin:/usr/bin:/bin:/usr/local/sbin",
-                },
-            }
-        },
-        allowed_tools=["mcp__coder__*"],
-        permission_mode="bypassPermissions",
-        setting_sources=[],
-        resume=resume_id,
-    )
+    return ClaudeAgentOptions(**_BASE_OPTIONS_KW, resume=resume_id)
+
+
+# ── Client pool ─────────────────────────────────────────────────────────────────
+# chat_id → připojený klient; MCP subprocess a handshake se tak neopakují
+# pro každou zprávu. Nečinný klient se po _CLIENT_IDLE_TIMEOUT s odpojí
+# a další zpráva naváže přes resume ze `sessions`.
+_CLIENT_IDLE_TIMEOUT = 600
+
+clients: dict[int, ClaudeSDKClient] = {}
+_chat_locks: dict[int, asyncio.Lock] = {}
+_idle_timers: dict[int, asyncio.TimerHandle] = {}
+_idle_closes: set[asyncio.Task] = set()  # drží reference, jinak je GC může zahodit
+
+
+def _chat_lock(chat_id: int) -> asyncio.Lock:
+    """Zprávy jednoho chatu jdou přes klienta postupně."""
+    lock = _chat_locks.get(chat_id)
+    if lock is None:
+        lock = _chat_locks[chat_id] = asyncio.Lock()
+    return lock
+
+
+async def get_client(chat_id: int) -> ClaudeSDKClient:
+    client = clients.get(chat_id)
+    if client is None:
+        client = ClaudeSDKClient(options=make_options(sessions.get(chat_id)))
+        await client.connect()
+        clients[chat_id] = client
+    return client
+
+
+async def _disconnect(chat_id: int) -> None:
+    """Odpojí klienta chatu (volající drží _chat_lock)."""
+    timer = _idle_timers.pop(chat_id, None)
+    if timer is not None:
+        timer.cancel()
+    client = clients.pop(chat_id, None)
+    if client is not None:
+        try:
+            await client.disconnect()
+        except Exception:
+            pass
+
+
+async def close_client(chat_id: int) -> None:
+    async with _chat_lock(chat_id):
+        await _disconnect(chat_id)
+
+
+def _schedule_idle_close(chat_id: int) -> None:
+    timer = _idle_timers.pop(chat_id, None)
+    if timer is not None:
+        timer.cancel()
+    if chat_id in clients:
+        _idle_timers[chat_id] = asyncio.get_running_loop().call_later(
+            _CLIENT_IDLE_TIMEOUT, _spawn_idle_close, chat_id
+        )
+
+
+def _spawn_idle_close(chat_id: int) -> None:
+    task = asyncio.create_task(close_client(chat_id))
+    _idle_closes.add(task)
+    task.add_done_callback(_idle_closes.discard)
+
+
+async def close_all_clients() -> None:
+    """Při vypnutí odpojí všechny klienty, ať CLI a MCP subprocesy nepřežijí bota.
+
+    Bez _chat_lock - polling už stojí a na doběhnutí rozjetých odpovědí se
+    nečeká.
+    """
+    await asyncio.gather(*(_disconnect(chat_id) for chat_id in list(clients)))
+
+
+# Průběžné náhledy: nejvýš jeden edit za _EDIT_INTERVAL s a jen při změně
+# aspoň o _EDIT_MIN_CHARS znaků (šetří Telegram API limity)
+_EDIT_INTERVAL = 0.8
+_EDIT_MIN_CHARS = 64
+
+
+async def _edit_preview(status_msg: Message, text: str) -> None:
+    try:
+        await status_msg.edit_text(text, parse_mode=ParseMode.MARKDOWN)
+    except Exception:
+        pass
+
+
+class PreviewEditor:
+    """Edituje status zprávu na pozadí, odděleně od čtení Claude streamu.
+
+    Fronta má jedno místo a slučuje: během běžícího editu se drží jen
+    poslední náhled, starší se zahodí. Stream tak nikdy nečeká na Telegram
+    (pomalá síť, 429) a rozběhnuté edity se neruší v půlce.
+    """
+
+    def __init__(self, status_msg: Message):
+        self.status_msg = status_msg
+        self.pending: str | None = None
+        self.task: asyncio.Task | None = None
+
+    def submit(self, text: str) -> None:
+        self.pending = text
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self.pending is not None:
+            text, self.pending = self.pending, None
+            await _edit_preview(self.status_msg, text)
+
+    async def close(self) -> None:
+        """Zahodí čekající náhled a počká na běžící edit (nesmí přepsat finál)."""
+        self.pending = None
+        if self.task is not None:
+            await self.task
+            self.task = None
+
+
+async def _send_typing(chat_id: int) -> None:
+    try:
+        await bot.send_chat_action(chat_id, ChatAction.TYPING)
+    except Exception:
+        pass  # jen kosmetika - odpověď na tom nezávisí
+
+
+async def _edit_markdown(status_msg: Message, text: str) -> None:
+    """Edit s Markdownem; když ho Telegram odmítne (rozbitá entita), pošle prostý text."""
+    try:
+        await status_msg.edit_text(text, parse_mode=ParseMode.MARKDOWN)
+    except TelegramBadRequest:
+        await status_msg.edit_text(text)
+
+
+async def _reply_markdown(message: Message, text: str) -> None:
+    try:
+        await message.reply(text, parse_mode=ParseMode.MARKDOWN)
+    except TelegramBadRequest:
+        await message.reply(text)
+
+
+# Krátká jména toolů pro UI ("coder_list_workspaces" → "list_workspaces");
+# toolů je pár desítek, každé jméno se tak převádí jen jednou
+_TOOL_SHORT: dict[str, str] = {}
+
+
+def _tool_short(name: str) -> str:
+    short = _TOOL_SHORT.get(name)
+    if short is None:
+        short = _TOOL_SHORT[name] = name.removeprefix("coder_")
+    return short
 
 
 def truncate(text: str, limit: int = 4000) -> str:
@@ -121,24 +343,47 @@ def truncate(text: str, limit: int = 4000) -> str:
 
 def split_message(text: str, limit: int = 4000) -> list[str]:
     """Rozdělí dlouhý text na bloky max. limit znaků."""
-    if len(text) <= limit:
+    n = len(text)
+    if n <= limit:
         return [text]
+    # Jeden průchod přes offsety - text se nepřeřezává, každý blok se slicuje jednou
     parts = []
-    while text:
-        if len(text) <= limit:
-            parts.append(text)
+    start = 0
+    while start < n:
+        end = start + limit
+        if end >= n:
+            parts.append(text[start:])
             break
-        # Hledej vhodné místo pro rozdělení (odstavec, řádek)
-        cut = text.rfind("\n\n", 0, limit)
-        if cut == -1:
-            cut = text.rfind("\n", 0, limit)
-        if cut == -1:
-            cut = limit
-        parts.append(text[:cut])
-        text = text[cut:].lstrip("\n")
+        # Hledej vhodné místo pro rozdělení (odstavec, řádek, mezera)
+        cut = text.rfind("\n\n", start, end)
+        if cut <= start:
+            cut = text.rfind("\n", start, end)
+        space_cut = cut <= start
+        if space_cut:
+            cut = text.rfind(" ", start, end)
+        if cut <= start:
+            cut = end
+            space_cut = False
+        parts.append(text[start:cut])
+        # Přeskoč oddělovač na začátku dalšího bloku: po řezu na řádku jen
+        # "\n" (odsazení v kódu/seznamu zůstane), po řezu na mezeře tu mezeru
+        start = cut
+        if space_cut:
+            start += 1
+        else:
+            while start < n and text[start] == "\n":
+                start += 1
     return parts
 
 
+# ── MarkdownV2 ──────────────────────────────────────────────────────────────────
+_START_TEXT = (
+    "👋 *Coder Agent* je připraven\\!\n\n"
+    "Piš přímo — ptej se na workspace, vytváření úloh, logy atd\\.\n"
+    "Příkazy: /reset \\(nová konverzace\\) /help"
+)
+
+
 # ── Bot setup ───────────────────────────────────────────────────────────────────
 bot = Bot(token=TELEGRAM_BOT_TOKEN)
 dp = Dispatcher()
@@ -148,17 +393,14 @@ dp = Dispatcher()
 async def cmd_start(message: Message):
     chat_id = message.chat.id
     sessions.pop(chat_id, None)
-    await message.reply(
-        "👋 *Coder Agent* je připraven\\!\n\n"
-        "Piš přímo — ptej se na workspace, vytváření úloh, logy atd\\.\n"
-        "Příkazy: /reset \\(nová konverzace\\) /help",
-        parse_mode=ParseMode.MARKDOWN_V2,
-    )
+    await close_client(chat_id)
+    await message.reply(_START_TEXT, parse_mode=ParseMode.MARKDOWN_V2)
 
 
 @dp.message(Command("reset"))
 async def cmd_reset(message: Message):
     sessions.pop(message.chat.id, None)
+    await close_client(message.chat.id)
     await message.reply("✅ Konverzace resetována. Začni psát!")
 
 
@@ -182,96 +424,118 @@ async def cmd_help(message: Message):
 
 @dp.message(F.text)
 async def handle_message(message: Message):
+    chat_id = message.chat.id
+    async with _chat_lock(chat_id):
+        timer = _idle_timers.pop(chat_id, None)
+        if timer is not None:
+            timer.cancel()
+        try:
+            await answer(message)
+        finally:
+            _schedule_idle_close(chat_id)
+
+
+async def answer(message: Message):
+    """Jedna otázka → odpověď přes klienta chatu (volající drží _chat_lock)."""
     chat_id = message.chat.id
     user_text = message.text
 
-    # Typing indicator
-    await bot.send_chat_action(chat_id, ChatAction.TYPING)
+    # Typing indicator běží souběžně se status zprávou - o jeden roundtrip méně
+    typing = asyncio.create_task(_send_typing(chat_id))
 
     # Status message
     status_msg = await message.reply("⏳ Pracuji…")
+    await typing
 
-    resume_id = sessions.get(chat_id)
-    options = make_options(resume_id)
-
-    full_text = ""
+    # Text se sbírá do listu a spojuje jen když je potřeba (náhled, finál)
+    text_parts: list[str] = []
+    full_len = 0
     tools_used: list[str] = []
+    tools_prefix = ""  # "⚙ `a` `b`" - přepočítá se jen při novém toolu
     new_session_id: str | None = None
 
+    loop = asyncio.get_running_loop()
+    last_edit = 0.0
+    last_len = 0
+    previews = PreviewEditor(status_msg)
+
+    def schedule_edit(preview: str) -> None:
+        nonlocal last_edit, last_len
+        previews.submit(preview)
+        last_edit = loop.time()
+        last_len = full_len
+
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            await client.query(user_text)
-
-            async for msg in client.receive_response():
-                if isinstance(msg, SystemMessage):
-                    # Zachyť session_id z init zprávy
-                    if hasattr(msg, "data") and isinstance(msg.data, dict):
-                        new_session_id = msg.data.get("session_id")
-                    elif hasattr(msg, "session_id"):
-                        new_session_id = msg.session_id
-
-                elif isinstance(msg, AssistantMessage):
-                    for block in msg.content:
-                        if isinstance(block, TextBlock) and block.text:
-                            full_text += block.text
-                            # Průběžná aktualizace (každých ~200 znaků)
-                            if len(full_text) % 200 < 20:
-                                preview = truncate(full_text)
-                                if tools_used:
-                                    preview = (
-                                        "⚙ `"
-                                        + "` `".join(tools_used)
-                                        + "`\n\n"
-                                        + preview
-                                    )
-                                try:
-                                    await status_msg.edit_text(
-                                        preview, parse_mode=ParseMode.MARKDOWN
-                                    )
-                                except Exception:
-                                    pass
-
-                        elif isinstance(block, ToolUseBlock):
-                            tool_short = block.name.removeprefix("coder_")
-                            tools_used.append(tool_short)
-                            preview = "⚙ `" + "` `".join(tools_used) + "`"
-                            if full_text:
-                                preview += "\n\n" + truncate(full_text)
-                            try:
-                                await status_msg.edit_text(
-                                    preview, parse_mode=ParseMode.MARKDOWN
-                                )
-                            except Exception:
-                                pass
-
-                elif isinstance(msg, ResultMessage):
-                    cost = msg.total_cost_usd or 0
-                    if new_session_id is None:
-                        new_session_id = msg.session_id
-                    footer = f"\n\n_{msg.num_turns} turns · ${cost:.4f}_"
-                    final = full_text or "_(bez odpovědi)_"
-
-                    # Odešli finální odpověď (rozdělena pokud příliš dlouhá)
-                    parts = split_message(final)
-                    if tools_used:
-                        header = "⚙ `" + "` `".join(tools_used) + "`\n\n"
-                        parts[0] = header + parts[0]
-                    parts[-1] += footer
-
-                    # První part edituje status_msg, zbytek posílá nové zprávy
-                    await status_msg.edit_text(
-                        truncate(parts[0]), parse_mode=ParseMode.MARKDOWN
-                    )
+        client = await get_client(chat_id)
+        await client.query(user_text)
+
+        async for msg in client.receive_response():
+            if isinstance(msg, SystemMessage):
+                # Zachyť session_id z init zprávy
+                if hasattr(msg, "data") and isinstance(msg.data, dict):
+                    new_session_id = msg.data.get("session_id")
+                elif hasattr(msg, "session_id"):
+                    new_session_id = msg.session_id
+
+            elif isinstance(msg, AssistantMessage):
+                for block in msg.content:
+                    if isinstance(block, TextBlock) and block.text:
+                        text_parts.append(block.text)
+                        full_len += len(block.text)
+                        # Průběžná aktualizace (throttlovaná časem)
+                        if (
+                            loop.time() - last_edit >= _EDIT_INTERVAL
+                            and full_len - last_len >= _EDIT_MIN_CHARS
+                        ):
+                            preview = truncate("".join(text_parts))
+                            if tools_prefix:
+                                preview = tools_prefix + "\n\n" + preview
+                            schedule_edit(preview)
+
+                    elif isinstance(block, ToolUseBlock):
+                        short = _tool_short(block.name)
+                        tools_used.append(short)
+                        tools_prefix = "⚙ `" + "` `".join(tools_used) + "`"
+                        preview = tools_prefix
+                        if text_parts:
+                            preview += "\n\n" + truncate("".join(text_parts))
+                        schedule_edit(preview)
+
+            elif isinstance(msg, ResultMessage):
+                cost = msg.total_cost_usd or 0
+                if new_session_id is None:
+                    new_session_id = msg.session_id
+                footer = f"\n\n_{msg.num_turns} turns · ${cost:.4f}_"
+                final = "".join(text_parts) or "_(bez odpovědi)_"
+
+                # Odešli finální odpověď (rozdělena pokud příliš dlouhá).
+                # Místo pro hlavičku a patičku se odečte už při dělení, takže
+                # žádný part nepřeteče a nic se neořízne.
+                header = truncate(tools_prefix, 1000) + "\n\n" if tools_prefix else ""
+                parts = split_message(final, 4000 - len(header) - len(footer))
+                parts[0] = header + parts[0]
+                parts[-1] += footer
+
+                await previews.close()
+
+                # První part edituje status_msg, zbytek posílá nové zprávy.
+                # Edit existující zprávy běží souběžně s odesíláním;
+                # nové zprávy jdou za sebou, aby v chatu zůstalo pořadí.
+                edit = asyncio.create_task(_edit_markdown(status_msg, parts[0]))
+                try:
                     for part in parts[1:]:
-                        await message.reply(
-                            truncate(part), parse_mode=ParseMode.MARKDOWN
-                        )
+                        await _reply_markdown(message, part)
+                finally:
+                    await edit
 
         # Uložení session_id pro pokračování konverzace
         if new_session_id:
             sessions[chat_id] = new_session_id
 
     except Exception as e:
+        await previews.close()
+        # Stav klienta po chybě neznáme - další zpráva začne s novým
+        await _disconnect(chat_id)
         err = str(e)[:200]
         try:
             await status_msg.edit_text(
@@ -284,8 +548,16 @@ async def handle_message(message: Message):
 async def main():
     print(f"Coder Telegram Bot spuštěn (server: {CODER_URL})")
     print("Ctrl+C pro zastavení")
-    await dp.start_polling(bot)
+    sessions.load()
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await close_all_clients()
+        sessions.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Společný základ system promptu pro agent.py, bot.py a web.py.
+
+Úvod, setup a formát tabulky projektů jsou pro všechna rozhraní stejné; každé
+rozhraní si za ně přidá vlastní sekce (schopnosti, workflow, formátování).
+Seznam projektů se liší: agent.py zná PROJECTS, bot.py a web.py CHAT_PROJECTS.
+Prompt se skládá jednou při importu - stejný prefix napříč turny a procesy
+je předpoklad pro prompt caching na straně API.
+"""
+
+# ── Projekty (projekt → GitHub repo) ──────────────────────────────────────────
+# Kompletní seznam pro agent.py (CLI)
+PROJECTS: dict[str, str] = {
+    "dotfiles": "chocholous/dotfiles",
+    "agentickeboola_web": "pavel242242/agentic-bridge-core",
+    "applicator": "chocholous/applicator",
+    "bg": "pavel242242/bg",
+    "compare": "chocholous/budget-builder",
+    "dataapps": "padak/e2b-dataapps-demo",
+    "datagen": "pavel242242/datagen",
+    "datatalk-events": "chocholous/datatalk-events",
+    "db-mcp": "pavel242242/sql-databases-mcp",
+    "driver-builder": "padak/driver_builder",
+    "driver_builder": "padak/driver_builder",
+    "driver_builder_ui": "padak/driver_builder",
+    "e2b-tereza": "padak/e2b-tereza",
+    "get-started": "pavel242242/osiris-get-started",
+    "get-started-x": "pavel242242/osiris-get-started",
+    "linear": "padak/pizza-team",
+    "mcp-cli": "chocholous/mcp-cli",
+    "mi-ui2": "keboola/sales-asisstant-agent-ui",
+    "mysql": "pavel242242/mysql",
+    "mysql-p": "keboola/setup-cdc-python",
+    "ng_component": "pavel242242/ng_component",
+    "ng_component_k2": "pavel242242/ng_component",
+    "osir": "keboola/osiris",
+    "padak-e2b": "keboola/e2b_demo",
+    "portland-extension": "pavel242242/portland-extension",
+    "pricing": "keboola/pricing-agent",
+    "rohlik_bot": "padak/rohlik_bot",
+    "salescrew": "pavel242242/salescrew",
+    "setup-experiment": "chocholous/budget-builder",
+    "small-data-sf-2025": "dlt-hub/small-data-sf-2025",
+    "STAGEHAND": "pavel242242/bohemian-hackathon",
+    "surf": "e2b-dev/surf",
+    "testing-applicator": "chocholous/applicator",
+    "testing-applicator-backup": "chocholous/applicator",
+    "thevibecoder_lovable": "pavel242242/thevibecoders",
+    "thevibecoders-revamped": "chocholous/thevibecoders-revamped",
+    "ultra-apify": "chocholous/apify-browser",
+    "vibecoders-react": "chocholous/vibecoders-react",
+    "vibe-coding": "pavel242242/fans",
+}
+
+
+def _render_projects(projects: dict[str, str]) -> str:
+    """Tabulka pro prompt: aliasy stejného repa sloučené na jeden řádek."""
+    by_repo: dict[str, list[str]] = {}
+    for name, repo in projects.items():
+        by_repo.setdefault(repo, []).append(name)
+    return "\n".join(
+        f"{', '.join(sorted(names, key=str.lower))}→{repo}"
+        for repo, names in sorted(by_repo.items(), key=lambda kv: min(kv[1], key=str.lower).lower())
+    )
+
+
+# Aliasy a projekty, které zná jen agent.py; Telegram bot a web chat je v promptu
+# neměly a nemají
+_AGENT_ONLY = frozenset({
+    "driver_builder",
+    "driver_builder_ui",
+    "get-started-x",
+    "mysql-p",
+    "ng_component_k2",
+    "setup-experiment",
+    "small-data-sf-2025",
+    "testing-applicator-backup",
+})
+CHAT_PROJECTS: dict[str, str] = {
+    name: repo for name, repo in PROJECTS.items() if name not in _AGENT_ONLY
+}
+
+
+def prompt_header(coder_url: str, projects: dict[str, str]) -> str:
+    """Úvod + setup + projekty - prefix system promptu všech rozhraní."""
+    return f"""Jsi Coder workspace management assistant s přístupem na Coder instanci přes MCP.
+
+## Setup
+- URL: {coder_url}
+- Server: Hetzner VPS, Docker Compose (Coder + PostgreSQL + Caddy)
+- Template: dev-workspace — Docker kontejnery s Claude Code, Git, Node.js, Python 3.13
+
+## Dostupné projekty (projekt → GitHub repo)
+{_render_projects(projects)}
+
+"""
@@ -3,25 +3,45 @@
 Coder Agent Web Chat
 Spuštění: .venv/bin/python web.py
 Pak otevři http://localhost:8080
+
+marked.js se servíruje lokálně, pokud existuje static/marked.min.js
+(curl -fsSL -o static/marked.min.js https://cdn.jsdelivr.net/npm/marked@15.0.12/marked.min.js),
+jinak ho stránka načte z CDN.
 """
 
 import asyncio
+import base64
+import gzip
+import hashlib
+import html
 import json
 import os
 import sys
 from pathlib import Path
 
+_HERE = Path(__file__).resolve().parent
+
 os.environ.pop("CLAUDECODE", None)
 
 try:
     from dotenv import load_dotenv
 
-    load_dotenv(Path(__file__).parent / ".env")
+    load_dotenv(_HERE / ".env")
 except ImportError:
     pass
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+try:
+    import brotli
+except ImportError:
+    brotli = None  # volitelné - bez něj se servíruje jen gzip
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # volitelné - fallback na stdlib json
+
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response
 import uvicorn
 
 from claude_agent_sdk import ClaudeSDKClient, ClaudeAgentOptions
@@ -32,6 +52,8 @@ from claude_agent_sdk.types import (
     ToolUseBlock,
 )
 
+from coder_prompt import CHAT_PROJECTS, prompt_header
+
 CODER_URL = os.environ.get("CODER_URL", "https://46-225-180-131.nip.io")
 CODER_SESSION_TOKEN = os.environ.get("CODER_SESSION_TOKEN", "")
 CODER_BINARY = os.environ.get("CODER_BINARY", "/usr/local/bin/coder")
@@ -40,32 +62,7 @@ if not CODER_SESSION_TOKEN:
     print("CHYBA: CODER_SESSION_TOKEN není nastaveno.")
     sys.exit(1)
 
-SYSTEM_PROMPT = f"""Jsi Coder workspace management assistant s přístupem na Coder instanci přes MCP.
-
-## Setup
-- URL: {CODER_URL}
-- Server: Hetzner VPS, Docker Compose (Coder + PostgreSQL + Caddy)
-- Template: dev-workspace — Docker kontejnery s Claude Code, Git, Node.js, Python 3.13
-
-## Dostupné projekty (projekt → GitHub repo)
-dotfiles→chocholous/dotfiles, agentickeboola_web→pavel242242/agentic-bridge-core,
-applicator→chocholous/applicator, bg→pavel242242/bg, compare→chocholous/budget-builder,
-dataapps→padak/e2b-dataapps-demo, datagen→pavel242242/datagen,
-datatalk-events→chocholous/datatalk-events, db-mcp→pavel242242/sql-databases-mcp,
-driver-builder→padak/driver_builder, e2b-tereza→padak/e2b-tereza,
-get-started→pavel242242/osiris-get-started, linear→padak/pizza-team,
-mcp-cli→chocholous/mcp-cli, mi-ui2→keboola/sales-asisstant-agent-ui,
-mysql→pavel242242/mysql, ng_component→pavel242242/ng_component,
-osir→keboola/osiris, padak-e2b→keboola/e2b_demo,
-portland-extension→pavel242242/portland-extension, pricing→keboola/pricing-agent,
-rohlik_bot→padak/rohlik_bot, salescrew→pavel242242/salescrew,
-STAGEHAND→pavel242242/bohemian-hackathon, surf→e2b-dev/surf,
-testing-applicator→chocholous/applicator, thevibecoder_lovable→pavel242242/thevibecoders,
-thevibecoders-revamped→chocholous/thevibecoders-revamped,
-ultra-apify→chocholous/apify-browser, vibecoders-react→chocholous/vibecoders-react,
-vibe-coding→pavel242242/fans
-
-## Co umíš
+SYSTEM_PROMPT = prompt_header(CODER_URL, CHAT_PROJECTS) + """## Co umíš
 - Listovat, vytvářet, startovat, stopovat, mazat workspace
 - Spouštět bash příkazy ve workspacích (coder_workspace_bash)
 - Číst/zapisovat/editovat soubory ve workspacích
@@ -82,28 +79,69 @@ Odpovídej česky a stručně. Používej nástroje proaktivně.
 """
 
 
-def make_options() -> ClaudeAgentOptions:
-    return ClaudeAgentOptions(
-        system_prompt=SYSTEM_PROMPT,
-        max_turns=25,
-        mcp_servers={
-            "coder": {
-                "command": CODER_BINARY,
-                "args": ["exp", "mcp", "server"],
-                "env": {
-                    "CODER_URL": CODER_URL,
-                    "CODER_SESSION_TOKEN": CODER_SESSION_TOKEN,
-                    "HOME": os.environ.get("HOME", "/root"),
-                    "PATH": "/usr/local/bin:/usr/bin:/bin:/usr/local/sbin",
-                },
-            }
-        },
-        allowed_tools=["mcp__coder__*"],
-        permission_mode="bypassPermissions",
-        setting_sources=[],
+# Parametry klienta - sestavené jednou při startu, ne pro každé spojení
+_BASE_OPTIONS_KW = {
+    "system_prompt": SYSTEM_PROMPT,
+    "max_turns": 25,
+    "mcp_servers": {
+        "coder": {
+            "command": CODER_BINARY,
+            "args": ["exp", "mcp", "server"],
+            "env": {
+                "CODER_URL": CODER_URL,
+                "CODER_SESSION_TOKEN": CODER_SESSION_TOKEN,
+                "HOME": os.environ.get("HOME", "/root"),
+                "PATH": "/usr/local/bin:/usr/bin:/bin:/usr/local/sbin",
+            },
+        }
+    },
+    "allowed_tools": ["mcp__coder__*"],
+    "permission_mode": "bypassPermissions",
+    "setting_sources": [],
+}
+
+
+# ── marked.js ──────────────────────────────────────────────────────────────────
+# Lokální kopie = žádný DNS/TLS roundtrip na CDN před prvním renderem.
+# static/marked.min.js má odpovídat _MARKED_VERSION; verze je i v URL, takže
+# po jejím zvednutí prohlížeč nesáhne po kopii z cache.
+# _MARKED_SRI je publikovaný sha384 souboru z CDN pro _MARKED_VERSION (mění se
+# spolu s verzí). Je-li vyplněný, jde jako integrity na CDN tagy a ověří se
+# jím i lokální kopie; nesouhlasící kopie se neservíruje.
+# Web Worker načítá marked přes importScripts, kde integrity nejde použít.
+_MARKED_VERSION = "15.0.12"
+_MARKED_SRI: str | None = None
+_MARKED_CDN = f"https://cdn.jsdelivr.net/npm/marked@{_MARKED_VERSION}/marked.min.js"
+_MARKED_PATH = _HERE / "static" / "marked.min.js"
+_MARKED_JS = _MARKED_PATH.read_bytes() if _MARKED_PATH.is_file() else None
+
+if _MARKED_JS is not None and _MARKED_SRI is not None:
+    _local_sri = "sha384-" + base64.b64encode(hashlib.sha384(_MARKED_JS).digest()).decode()
+    if _local_sri != _MARKED_SRI:
+        print(
+            f"⚠️  {_MARKED_PATH} neodpovídá marked@{_MARKED_VERSION}, použije se CDN",
+            file=sys.stderr,
+        )
+        _MARKED_JS = None
+
+if _MARKED_JS is not None:
+    MARKED_SRC = f"/marked.min.js?v={_MARKED_VERSION}"
+    MARKED_TAGS = (
+        f'<link rel="preload" href="{MARKED_SRC}" as="script">\n'
+        f'<script src="{MARKED_SRC}" defer></script>'
+    )
+else:
+    MARKED_SRC = _MARKED_CDN
+    _cdn_attrs = 'crossorigin="anonymous"'
+    if _MARKED_SRI is not None:
+        _cdn_attrs += f' integrity="{_MARKED_SRI}"'
+    MARKED_TAGS = (
+        f'<link rel="preload" href="{MARKED_SRC}" as="script" {_cdn_attrs}>\n'
+        f'<script src="{MARKED_SRC}" {_cdn_attrs} defer></script>'
     )
 
 
+# CODER_URL jde do stránky přes sentinel, escapovaný jednou při importu
 HTML = (
     """<!DOCTYPE html>
 <html lang="cs">
@@ -111,7 +149,9 @@ HTML = (
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
 <title>Coder Agent</title>
-<script src="https://cdn.jsdelivr.net/npm/marked/marked.min.js"></script>
+"""
+    + MARKED_TAGS
+    + """
 <style>
   * { box-sizing: border-box; margin: 0; padding: 0; }
   :root {
@@ -291,9 +331,7 @@ HTML = (
 <header>
   <div class="dot" id="status-dot"></div>
   <h1>Coder Agent</h1>
-  <span class="url">"""
-    + CODER_URL
-    + """</span>
+  <span class="url">__CODER_URL__</span>
 </header>
 <div id="chat">
   <div class="welcome">
@@ -315,11 +353,82 @@ const statusEl = document.getElementById('status');
 const statusDot = document.getElementById('status-dot');
 
 let ws = null;
+const utf8 = new TextDecoder();
 let currentBubble = null;
 let currentTools = [];
 let currentText = '';
 let isStreaming = false;
 
+// Markdown se během streamu parsuje ve Web Workeru, ne na UI vlákně.
+// Hotové odstavce (za prázdným řádkem mimo ``` blok) se parsují jednou
+// a HTML se drží ve stableHtml; při každém tokenu se parsuje jen rozepsaný konec.
+const MARKED_URL = new URL('"""
+    + MARKED_SRC
+    + """', location.href).href;
+let mdWorker = null;
+let renderSeq = 0;     // zvýší se s každou novou/ukončenou zprávou - staré výsledky se zahodí
+let stableHtml = '';
+let stableLen = 0;     // kolik znaků currentText pokrývá stableHtml
+let tailBusy = false;  // worker právě parsuje konec
+let tailDirty = false; // mezitím přišel další text
+
+try {
+  const src = "importScripts('" + MARKED_URL + "');\\n" +
+    "onmessage = (e) => postMessage({ seq: e.data.seq, stable: e.data.stable, html: marked.parse(e.data.text) });";
+  mdWorker = new Worker(URL.createObjectURL(new Blob([src], { type: 'text/javascript' })));
+  mdWorker.onmessage = onParsed;
+  mdWorker.onerror = () => { mdWorker = null; };
+} catch (err) {
+  mdWorker = null;  // fallback: parse na hlavním vlákně
+}
+
+function stableCut(text, from) {
+  // Poslední "\\n\\n" za from, které neleží uvnitř ``` bloku
+  let cut = -1;
+  let inFence = (text.slice(0, from).split('```').length - 1) % 2 === 1;
+  let i = from;
+  while (true) {
+    const fence = text.indexOf('```', i);
+    const para = text.indexOf('\\n\\n', i);
+    if (para === -1) break;
+    if (fence !== -1 && fence < para) {
+      inFence = !inFence;
+      i = fence + 3;
+      continue;
+    }
+    if (!inFence) cut = para + 2;
+    i = para + 2;
+  }
+  return cut;
+}
+
+function renderStream() {
+  if (!mdWorker) {
+    currentBubble.innerHTML = marked.parse(currentText) + '<span class="cursor"></span>';
+    scrollBottom();
+    return;
+  }
+  if (tailBusy) { tailDirty = true; return; }
+  const cut = stableCut(currentText, stableLen);
+  if (cut > stableLen) {
+    mdWorker.postMessage({ seq: renderSeq, stable: true, text: currentText.slice(stableLen, cut) });
+    stableLen = cut;
+  }
+  tailBusy = true;
+  tailDirty = false;
+  mdWorker.postMessage({ seq: renderSeq, stable: false, text: currentText.slice(stableLen) });
+}
+
+function onParsed(e) {
+  const { seq, stable, html } = e.data;
+  if (seq !== renderSeq || !currentBubble) return;
+  if (stable) { stableHtml += html; return; }
+  tailBusy = false;
+  currentBubble.innerHTML = stableHtml + html + '<span class="cursor"></span>';
+  scrollBottom();
+  if (tailDirty) renderStream();
+}
+
 function setStatus(msg, ready) {
   statusEl.textContent = msg;
   statusDot.className = 'dot' + (ready ? ' green' : '');
@@ -348,6 +457,11 @@ function startAssistantMsg() {
   currentTools = [];
   currentText = '';
   isStreaming = true;
+  renderSeq++;
+  stableHtml = '';
+  stableLen = 0;
+  tailBusy = false;
+  tailDirty = false;
 
   const msg = document.createElement('div');
   msg.className = 'msg assistant';
@@ -358,10 +472,19 @@ function startAssistantMsg() {
   scrollBottom();
 }
 
+// Text frame jen přidá text; překreslení je nejvýš jednou za snímek,
+// 'flush' od serveru (konec bloku) překreslí hned
+let renderFrame = 0;
+
 function appendText(text) {
   currentText += text;
-  currentBubble.innerHTML = marked.parse(currentText) + '<span class="cursor"></span>';
-  scrollBottom();
+  if (!renderFrame) renderFrame = requestAnimationFrame(flushRender);
+}
+
+function flushRender() {
+  if (renderFrame) cancelAnimationFrame(renderFrame);
+  renderFrame = 0;
+  if (isStreaming && currentBubble) renderStream();
 }
 
 function addTool(name) {
@@ -372,6 +495,7 @@ function addTool(name) {
 }
 
 function finishMsg(cost, turns) {
+  renderSeq++;  // rozpracované výsledky workeru už nepatří k této zprávě
   if (currentBubble) {
     currentBubble.innerHTML = marked.parse(currentText || '…');
     const meta = document.createElement('div');
@@ -388,22 +512,38 @@ function finishMsg(cost, turns) {
 function connect() {
   const proto = location.protocol === 'https:' ? 'wss' : 'ws';
   ws = new WebSocket(`${proto}://${location.host}/ws`);
+  ws.binaryType = 'arraybuffer';
 
   ws.onopen = () => setStatus('Inicializuji Coder MCP…', false);
 
   ws.onmessage = (e) => {
+    if (typeof e.data !== 'string') {
+      // Proud odpovědi: 1 bajt typu + UTF-8 payload (TAG_* ve web.py)
+      const v = new Uint8Array(e.data);
+      switch (v[0]) {
+        case 1:
+          if (!isStreaming) startAssistantMsg();
+          appendText(utf8.decode(v.subarray(1)));
+          break;
+        case 2:
+          if (!isStreaming) startAssistantMsg();
+          addTool(utf8.decode(v.subarray(1)));
+          break;
+        case 3: {
+          const d = JSON.parse(utf8.decode(v.subarray(1)));
+          finishMsg(d.cost || 0, d.turns || 1);
+          break;
+        }
+        case 4:
+          flushRender();
+          break;
+      }
+      return;
+    }
     const msg = JSON.parse(e.data);
     if (msg.type === 'ready') {
       chat.innerHTML = '';
       setStatus('Připraven', true);
-    } else if (msg.type === 'text') {
-      if (!isStreaming) startAssistantMsg();
-      appendText(msg.content);
-    } else if (msg.type === 'tool') {
-      if (!isStreaming) startAssistantMsg();
-      addTool(msg.name);
-    } else if (msg.type === 'done') {
-      finishMsg(msg.cost || 0, msg.turns || 1);
     } else if (msg.type === 'error') {
       if (currentBubble) currentBubble.innerHTML = '<em style="color:#f85149">Chyba: ' + escHtml(msg.message) + '</em>';
       isStreaming = false;
@@ -446,6 +586,52 @@ connect();
 </body>
 </html>
 """
+).replace("__CODER_URL__", html.escape(CODER_URL, quote=True))
+
+
+# Statické odpovědi - bajty, komprimované varianty i ETag se počítají jednou
+class StaticAsset:
+    def __init__(self, data: bytes, media_type: str, cache_control: str):
+        self.raw = data
+        self.gz = gzip.compress(data, 9)
+        self.br = brotli.compress(data) if brotli is not None else None
+        self.media_type = media_type
+        self.etag = 'W/"' + hashlib.sha1(data).hexdigest()[:8] + '"'
+        self.headers = {
+            "Cache-Control": cache_control,
+            "ETag": self.etag,
+            "Vary": "Accept-Encoding",
+        }
+
+    def response(self, request: Request) -> Response:
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=self.headers)
+
+        accept = request.headers.get("accept-encoding", "")
+        if self.br is not None and "br" in accept:
+            body, encoding = self.br, "br"
+        elif "gzip" in accept:
+            body, encoding = self.gz, "gzip"
+        else:
+            body, encoding = self.raw, None
+
+        headers = dict(self.headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+
+# Stránka nese i klienta websocket protokolu - prohlížeč ji musí při každém
+# načtení revalidovat (ETag → 304), jinak by stará verze neuměla nové frames
+_INDEX = StaticAsset(HTML.encode("utf-8"), "text/html; charset=utf-8", "no-cache")
+_MARKED = (
+    StaticAsset(
+        _MARKED_JS,
+        "text/javascript; charset=utf-8",
+        "public, max-age=31536000, immutable",  # URL nese verzi
+    )
+    if _MARKED_JS is not None
+    else None
 )
 
 
@@ -453,59 +639,198 @@ app = FastAPI(title="Coder Agent")
 
 
 @app.get("/")
-async def index():
-    return HTMLResponse(HTML)
+async def index(request: Request):
+    return _INDEX.response(request)
+
+
+@app.get("/marked.min.js")
+async def marked_js(request: Request):
+    if _MARKED is None:
+        return Response(status_code=404)
+    return _MARKED.response(request)
+
+
+# JSON přes websocket: orjson, pokud je k dispozici. JSON textem jdou jen
+# řídicí zprávy (ready, error); proud odpovědi jde binárně, viz ws_send_tagged
+if orjson is not None:
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+else:
+    _dumps = json.dumps
+    _loads = json.loads
+
+
+async def ws_send(websocket: WebSocket, obj) -> None:
+    await websocket.send_text(_dumps(obj))
+
+
+async def ws_receive(websocket: WebSocket):
+    return _loads(await websocket.receive_text())
+
+
+# Binární frame = 1 bajt typu + UTF-8 payload; prohlížeč větví podle v[0]
+# a na cestě tokenů nic neparsuje
+TAG_TEXT = 1
+TAG_TOOL = 2
+TAG_DONE = 3  # payload je JSON {"cost", "turns"}
+TAG_FLUSH = 4  # bez payloadu
+
+
+async def ws_send_tagged(websocket: WebSocket, tag: int, payload: str = "") -> None:
+    await websocket.send_bytes(bytes((tag,)) + payload.encode())
+
+
+# Textové tokeny se slučují do jednoho frame za _TEXT_FLUSH_INTERVAL s
+_TEXT_FLUSH_INTERVAL = 0.025
+
+
+class TextCoalescer:
+    """Sbírá text bloky a posílá je jedním TAG_TEXT frame.
+
+    flush() se volá před každou jinou zprávou (tool, done), aby pořadí
+    v prohlížeči zůstalo stejné jako ve streamu. boundary() na konci
+    assistant zprávy navíc pošle TAG_FLUSH - prohlížeč mezi tím
+    text jen sbírá a překresluje nejvýš jednou za snímek.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.buf: list[str] = []
+        self.timer: asyncio.Task | None = None
+        self.lock = asyncio.Lock()
+        self.sent_text = False  # od posledního boundary() odešel text
+
+    def push(self, text: str) -> None:
+        self.buf.append(text)
+        if self.timer is None:
+            self.timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(_TEXT_FLUSH_INTERVAL)
+        self.timer = None
+        await self._send()
+
+    async def flush(self) -> None:
+        timer, self.timer = self.timer, None
+        if timer is not None:
+            timer.cancel()  # ruší jen čekání; rozběhnuté odeslání drží lock
+        await self._send()
+
+    async def boundary(self) -> None:
+        await self.flush()
+        if self.sent_text:
+            self.sent_text = False
+            await ws_send_tagged(self.websocket, TAG_FLUSH)
+
+    def cancel(self) -> None:
+        """Zahodí čekající flush (spojení končí)."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    async def _send(self) -> None:
+        async with self.lock:
+            if not self.buf:
+                return
+            text = "".join(self.buf)
+            self.buf.clear()
+            await ws_send_tagged(self.websocket, TAG_TEXT, text)
+            self.sent_text = True
+
+
+# Krátká jména toolů pro UI ("coder_list_workspaces" → "list_workspaces");
+# toolů je pár desítek, každé jméno se tak převádí jen jednou
+_TOOL_SHORT: dict[str, str] = {}
+
+
+def _tool_short(name: str) -> str:
+    short = _TOOL_SHORT.get(name)
+    if short is None:
+        short = _TOOL_SHORT[name] = name.removeprefix("coder_")
+    return short
 
 
 @app.websocket("/ws")
 async def ws_endpoint(websocket: WebSocket):
     await websocket.accept()
-    options = make_options()
+    # Boot klienta (MCP subprocess + handshake) běží na pozadí; UI je hned
+    # připravené a první zpráva jen počká na dokončení bootu
+    client = ClaudeSDKClient(options=ClaudeAgentOptions(**_BASE_OPTIONS_KW))
+    connecting = asyncio.create_task(client.connect())
+    text_out = TextCoalescer(websocket)
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            await websocket.send_json({"type": "ready"})
-            while True:
-                data = await websocket.receive_json()
-                if data.get("type") != "message":
-                    continue
-                text = data.get("text", "").strip()
-                if not text:
-                    continue
-
-                await client.query(text)
-
-                async for msg in client.receive_response():
-                    if isinstance(msg, AssistantMessage):
-                        for block in msg.content:
-                            if isinstance(block, TextBlock) and block.text:
-                                await websocket.send_json(
-                                    {"type": "text", "content": block.text}
-                                )
-                            elif isinstance(block, ToolUseBlock):
-                                await websocket.send_json(
-                                    {
-                                        "type": "tool",
-                                        "name": block.name.removeprefix("coder_"),
-                                    }
-                                )
-                    elif isinstance(msg, ResultMessage):
-                        await websocket.send_json(
-                            {
-                                "type": "done",
-                                "cost": msg.total_cost_usd or 0,
-                                "turns": msg.num_turns,
-                            }
-                        )
+        await ws_send(websocket, {"type": "ready"})
+        while True:
+            data = await ws_receive(websocket)
+            if data.get("type") != "message":
+                continue
+            text = data.get("text", "").strip()
+            if not text:
+                continue
+
+            await connecting
+            await client.query(text)
+
+            async for msg in client.receive_response():
+                if isinstance(msg, AssistantMessage):
+                    for block in msg.content:
+                        if isinstance(block, TextBlock) and block.text:
+                            text_out.push(block.text)
+                        elif isinstance(block, ToolUseBlock):
+                            await text_out.flush()
+                            await ws_send_tagged(
+                                websocket, TAG_TOOL, _tool_short(block.name)
+                            )
+                    await text_out.boundary()
+                elif isinstance(msg, ResultMessage):
+                    await text_out.flush()
+                    await ws_send_tagged(
+                        websocket,
+                        TAG_DONE,
+                        _dumps(
+                            {"cost": msg.total_cost_usd or 0, "turns": msg.num_turns}
+                        ),
+                    )
     except WebSocketDisconnect:
         pass
     except Exception as e:
         try:
-            await websocket.send_json({"type": "error", "message": str(e)})
+            await text_out.flush()
+        except Exception:
+            pass
+        try:
+            await ws_send(websocket, {"type": "error", "message": str(e)})
         except Exception:
             pass
+    finally:
+        text_out.cancel()
+        connecting.cancel()  # no-op, pokud boot už doběhl
+        try:
+            # wait() nepropouští výjimku ani CancelledError zrušeného bootu;
+            # zrušení samotného handleru projde ven až po disconnect()
+            await asyncio.wait([connecting])
+            if not connecting.cancelled():
+                connecting.exception()  # jinak "exception was never retrieved"
+        finally:
+            # I napůl nabootovaný klient má subprocess (CLI + coder MCP)
+            try:
+                await client.disconnect()
+            except Exception:
+                pass
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", "8080"))
     print(f"Coder Agent Web Chat → http://localhost:{port}")
-    uvicorn.run(app, host="0.0.0.0", port=port, log_level="warning")
+    # uvloop je v requirements.txt mimo Windows; chybějící instalace tak selže
+    # hned při startu, ne tichým návratem na asyncio
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=port,
+        log_level="warning",
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+    )